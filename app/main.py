@@ -1,7 +1,6 @@
 import streamlit as st
 import os
 import json
-import tempfile
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
@@ -12,8 +11,11 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 from src.agents.prompt import SYS_PROMPT
-from src.agents.dimension_extractor import DimensionExtractor
-from src.parse_papers import chunk_pdf
+from src.agents.dimension_extractor import DimensionExtractor, MAX_OUTPUT_TOKENS, client_timeout
+from src.agents.model_router import ModelTier, TieredExtractor
+from src.parse_papers import chunk_pdf_bytes
+from src.analytics import ExtractionAggregates
+from src.search_index import SearchIndex
 
 # Load environment variables
 load_dotenv()
@@ -35,23 +37,55 @@ if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = []
 if 'custom_prompt' not in st.session_state:
     st.session_state.custom_prompt = SYS_PROMPT
+if 'use_routing' not in st.session_state:
+    st.session_state.use_routing = False
+if 'use_streaming' not in st.session_state:
+    st.session_state.use_streaming = True
+if 'aggregates' not in st.session_state:
+    st.session_state.aggregates = ExtractionAggregates.load()
+
+# Model tiers for routing: cheap/fast first, escalate to stronger models only when unsure.
+# The fast tier draws 3 concurrent samples; papers whose labels disagree escalate.
+MODEL_TIERS = [
+    {"name": "fast", "model": "anthropic:claude-haiku-4-5", "confidence_threshold": 0.7, "n_samples": 3, "cost_per_1k_input_tokens": 0.001},
+    {"name": "strong", "model": "anthropic:claude-sonnet-4-5", "confidence_threshold": 0.0, "n_samples": 1, "cost_per_1k_input_tokens": 0.003},
+]
 
 # Initialize LLM model
 @st.cache_resource
-def initialize_model():
+def initialize_model(model_name="anthropic:claude-haiku-4-5", streaming=False):
     """Initialize the Anthropic chat model."""
     return init_chat_model(
-        "anthropic:claude-haiku-4-5",
+        model_name,
         temperature=0.5,
-        timeout=30,
-        max_tokens=5000,
+        timeout=client_timeout(streaming),
+        max_tokens=MAX_OUTPUT_TOKENS,
     )
 
+# Load corpus search index (refreshes itself as new papers are parsed)
+@st.cache_resource
+def load_search_index():
+    """Load the on-disk chunk search index."""
+    return SearchIndex()
+
 # Initialize extractor agent
 def initialize_agent(sys_prompt):
     """Initialize the dimension extractor agent with optional custom prompt."""
-    model = initialize_model()
-    return DimensionExtractor(model=model, sys_prompt=sys_prompt)
+    if st.session_state.use_routing:
+        tiers = [
+            ModelTier(
+                name=t["name"],
+                model=initialize_model(t["model"], streaming=st.session_state.use_streaming),
+                confidence_threshold=t["confidence_threshold"],
+                n_samples=t["n_samples"],
+                cost_per_1k_input_tokens=t["cost_per_1k_input_tokens"],
+            )
+            for t in MODEL_TIERS
+        ]
+        return TieredExtractor(tiers=tiers, sys_prompt=sys_prompt, streaming=st.session_state.use_streaming)
+
+    model = initialize_model(streaming=st.session_state.use_streaming)
+    return DimensionExtractor(model=model, sys_prompt=sys_prompt, streaming=st.session_state.use_streaming)
 
 # Main app
 def main():
@@ -90,7 +124,20 @@ def main():
                     st.success("Prompt reset to default!")
                     st.rerun()
 
-        
+        st.checkbox(
+            "Tiered model routing",
+            key="use_routing",
+            help=(
+                "Sample the fast model 3 times and escalate papers with inconsistent labels to "
+                "Claude Sonnet. Changes cost: ~3x fast-model tokens per paper plus Sonnet for escalations."
+            )
+        )
+        st.checkbox(
+            "Stream responses",
+            key="use_streaming",
+            help="Show the model output as it is generated; timeouts scale with paper length"
+        )
+
         st.markdown("### About")
         st.info(
             "This tool analyzes research papers on supply chain management "
@@ -105,7 +152,7 @@ def main():
             st.rerun()
     
     # Main content
-    tab1, tab2, tab3 = st.tabs(["📤 Upload & Process", "📊 View Results", "💾 Export Data"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📤 Upload & Process", "📊 View Results", "💾 Export Data", "📈 Analytics", "🔎 Search"])
     
     # Tab 1: Upload and Process
     with tab1:
@@ -217,6 +264,24 @@ def main():
         else:
             st.info("No results to export. Process some papers first.")
 
+    # Tab 4: Cross-paper analytics
+    with tab4:
+        st.header("Corpus Analytics")
+        display_analytics(st.session_state.aggregates)
+
+    # Tab 5: Semantic search over parsed chunks
+    with tab5:
+        st.header("Search Papers")
+
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            query = st.text_input("Search query", placeholder="e.g. multi-agent inventory optimisation")
+        with col2:
+            top_k = st.number_input("Results", min_value=1, max_value=50, value=10)
+
+        if query:
+            display_search_results(load_search_index().search(query, k=int(top_k)))
+
 
 def process_papers(uploaded_files):
     """Process uploaded PDF files."""
@@ -234,45 +299,58 @@ def process_papers(uploaded_files):
             filename = uploaded_file.name
             status_text.text(f"Processing {filename}... ({idx+1}/{total_files})")
             
-            # Create temporary file to save uploaded PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_path = tmp_file.name
-            
-            try:
-                # Step 1: Parse PDF to chunks
-                with st.spinner(f"📖 Parsing {filename}..."):
-                    parsed_data = chunk_pdf(tmp_path)
-                
-                # Add filename to metadata
-                parsed_data['metadata']['source']['filename'] = filename
-                
-                # Step 2: Analyze with extractor agent
-                with st.spinner(f"🤖 Analyzing {filename}..."):
-                    analysis_result = agent.go_to_work(
-                        user_instructions="Please analyze and extract the following dimensions from this research paper:",
-                        input_data=parsed_data
-                    )
-                
-                # Combine results
-                result_data = {
-                    'filename': filename,
-                    'metadata': parsed_data.get('metadata', {}),
-                    'analysis': analysis_result
-                }
-                
-                st.session_state.analysis_results.append(result_data)
-                st.session_state.processed_papers.append(filename)
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(tmp_path)
-            
+            # Step 1: Parse PDF to chunks straight from the upload buffer
+            with st.spinner(f"📖 Parsing {filename}..."):
+                parsed_data = chunk_pdf_bytes(uploaded_file.getvalue(), filename=filename)
+            doc_id = parsed_data['metadata']['source']['doc_id']
+
+            # Step 2: Analyze with extractor agent, previewing streamed output
+            preview = st.empty()
+            streamed = []
+
+            def on_token(piece):
+                streamed.append(piece)
+                preview.code("".join(streamed)[-3000:], language="json")
+
+            def on_tier(tier_name):
+                streamed.clear()
+                preview.caption(f"Running {tier_name} model...")
+
+            work_kwargs = {}
+            if st.session_state.use_streaming:
+                work_kwargs["on_token"] = on_token
+                if isinstance(agent, TieredExtractor):
+                    work_kwargs["on_tier"] = on_tier
+
+            with st.spinner(f"🤖 Analyzing {filename}..."):
+                analysis_result = agent.go_to_work(
+                    user_instructions="Please analyze and extract the following dimensions from this research paper:",
+                    input_data=parsed_data,
+                    **work_kwargs
+                )
+            preview.empty()
+
+            # Combine results
+            result_data = {
+                'filename': filename,
+                'metadata': parsed_data.get('metadata', {}),
+                'analysis': analysis_result
+            }
+
+            st.session_state.analysis_results.append(result_data)
+            st.session_state.processed_papers.append(filename)
+            # Keyed by doc_id so different uploads sharing a file name count as separate papers
+            st.session_state.aggregates.record(doc_id, analysis_result)
+
             # Update progress
             progress_bar.progress((idx + 1) / total_files)
         
         status_text.text("✅ Processing complete!")
         st.success(f"Successfully processed {total_files} paper(s)!")
+
+        if isinstance(agent, TieredExtractor):
+            with st.expander("Model routing stats"):
+                st.dataframe(pd.DataFrame(agent.get_stats()), use_container_width=True)
         
         # Auto-switch to results tab would require additional logic
         st.balloons()
@@ -317,6 +395,46 @@ def display_result(result):
             st.warning("No dimensions extracted from this paper.")
 
 
+def display_analytics(aggregates):
+    """Display cross-paper aggregates maintained incrementally by ExtractionAggregates."""
+    if not aggregates.papers:
+        st.info("No analytics yet. Process some papers first.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Papers", aggregates.n_papers)
+    with col2:
+        st.metric("Agentic", aggregates.agentic.get("Agentic", 0))
+    with col3:
+        st.metric("Failed extractions", aggregates.failed)
+
+    st.subheader("DCM Capability × SCOR Process")
+    st.dataframe(aggregates.dcm_scor_matrix(), use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("SCRM Areas")
+        st.bar_chart(aggregates.distribution("scrm"))
+    with col2:
+        st.subheader("Agentic vs Non-agentic")
+        st.bar_chart(aggregates.distribution("agentic"))
+
+    st.subheader("Top Industry Sectors")
+    st.bar_chart(aggregates.distribution("sectors", top_n=20))
+
+
+def display_search_results(hits):
+    """Display ranked chunk matches from the search index."""
+    if not hits:
+        st.info("No matching chunks. If nothing has been indexed yet, process some papers first.")
+        return
+
+    for hit in hits:
+        with st.expander(f"📄 {hit['doc_id']} — chunk {hit['chunk_id']} (score {hit['score']:.2f})"):
+            st.write(hit['text'])
+
+
 def results_to_dataframe(results):
     """Convert analysis results to a pandas DataFrame."""
     rows = []
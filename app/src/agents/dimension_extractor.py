@@ -1,18 +1,58 @@
 from langchain.messages import HumanMessage
 import copy
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from langchain.agents import create_agent
 from langchain_core.output_parsers import PydanticOutputParser
 from src.agents.schemas import Dimensions
 from src.metadata import add_agent_metadata
 
 
+# Model client defaults shared with app/main.py
+MAX_OUTPUT_TOKENS = 5000
+REQUEST_TIMEOUT = 30
+
+
+def client_timeout(streaming: bool):
+    """Client-side request timeout; streaming mode enforces its own adaptive deadlines."""
+    return None if streaming else REQUEST_TIMEOUT
+
+
+def _run_sync(coro):
+    """Run a coroutine to completion from sync code, even inside a running loop (e.g. Jupyter)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed message chunk (Anthropic chunks may carry a list of content blocks)."""
+    if getattr(chunk, "type", "") not in ("AIMessageChunk", "ai"):
+        return ""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
 
 class DimensionExtractor():
-    def __init__(self, model, sys_prompt):
+    # Adaptive timeout setup (seconds); input size is estimated at ~4 chars per token
+    FIRST_TOKEN_TIMEOUT_BASE    = 15.0
+    FIRST_TOKEN_TIMEOUT_PER_10K = 10.0      # extra wait per 10k input tokens
+    OUTPUT_TOKENS_PER_SECOND    = 40.0
+    MAX_OUTPUT_TOKENS           = MAX_OUTPUT_TOKENS
+    HEDGE_FRACTION              = 0.5       # launch a hedge after this share of the first-token timeout
+    MAX_RETRIES                 = 1
+
+    def __init__(self, model, sys_prompt, streaming: bool = False):
         """Initialize DimensionExtractor with model and system prompt.
         Args:
             model: The LLM model to use
             sys_prompt: The system prompt for the agent
+            streaming: Stream tokens with adaptive timeouts and hedged retries
         """
         print(f"[DEBUG] Initializing DimensionExtractor with model={type(model).__name__}, prompt_length={len(sys_prompt) if sys_prompt else 0}")
         
@@ -20,6 +60,7 @@ class DimensionExtractor():
         self.version        = "1.0"
         self.model          = model
         self.sys_prompt     = sys_prompt
+        self.streaming      = streaming
 
         self.agent = create_agent(
             model           = self.model,
@@ -40,27 +81,140 @@ class DimensionExtractor():
         )
         
         return response
+
+    def adaptive_timeouts(self, n_input_chars: int):
+        """Return (first_token_timeout, total_timeout) scaled to the prompt size."""
+        n_input_tokens = n_input_chars / 4
+        first_token = self.FIRST_TOKEN_TIMEOUT_BASE + self.FIRST_TOKEN_TIMEOUT_PER_10K * n_input_tokens / 10_000
+        total = first_token + self.MAX_OUTPUT_TOKENS / self.OUTPUT_TOKENS_PER_SECOND
+        return first_token, total
+
+    async def _astream_attempt(self, messages: list, sink) -> str:
+        """Stream one request, passing every text piece to ``sink``."""
+        text = []
+        async for chunk, _ in self.agent.astream(
+            {"messages": messages},
+            config={"configurable": {"thread_id": "1"}},
+            stream_mode="messages",
+        ):
+            piece = _chunk_text(chunk)
+            if piece:
+                text.append(piece)
+                sink(piece)
+        return "".join(text)
+
+    async def _hedged_stream(self, messages: list, on_token, first_token_timeout: float, total_timeout: float) -> str:
+        """Race a hedged duplicate against a slow first attempt; the first to emit a token wins.
+
+        Attempts are asyncio tasks, so losers and timed-out attempts are
+        cancelled, which closes their HTTP streams instead of leaving them running.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first_token = asyncio.Event()
+        tasks: list = []
+        state = {"leader": None}
+
+        def make_sink(idx):
+            def sink(piece):
+                if state["leader"] is None:
+                    state["leader"] = idx
+                    first_token.set()
+                    for j, task in enumerate(tasks):
+                        if j != idx:
+                            task.cancel()
+                if state["leader"] == idx and on_token:
+                    on_token(piece)
+            return sink
+
+        def launch():
+            tasks.append(asyncio.create_task(self._astream_attempt(messages, make_sink(len(tasks)))))
+
+        launch()
+        try:
+            while state["leader"] is None:
+                now = loop.time()
+                if now >= start + first_token_timeout:
+                    raise TimeoutError(f"No response within {first_token_timeout:.0f}s")
+                hedged = len(tasks) > 1
+                wait_until = start + first_token_timeout * (1.0 if hedged else self.HEDGE_FRACTION)
+
+                waiter = asyncio.create_task(first_token.wait())
+                done, _ = await asyncio.wait(
+                    [waiter, *(t for t in tasks if not t.done())],
+                    timeout=max(0.0, wait_until - now),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                waiter.cancel()
+
+                # An attempt that finished without any text still settles the race
+                for idx, task in enumerate(tasks):
+                    if state["leader"] is None and task.done() and not task.cancelled() and task.exception() is None:
+                        state["leader"] = idx
+                if state["leader"] is None and all(t.done() for t in tasks):
+                    raise tasks[-1].exception()
+
+                if not done and not hedged:
+                    launch()
+                    print(f"[DEBUG] No first token after {loop.time() - start:.1f}s, launched hedged request")
+
+            remaining = max(0.0, start + total_timeout - loop.time())
+            try:
+                return await asyncio.wait_for(tasks[state["leader"]], timeout=remaining)
+            except TimeoutError:
+                raise TimeoutError(f"Response not complete within {total_timeout:.0f}s")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stream_invoke(self, user_msg: HumanMessage, on_token=None) -> str:
+        """Stream the model response, calling ``on_token(text)`` for each piece.
+
+        Timeouts scale with the prompt size and are enforced here, so the model
+        client should be created without its own timeout (see ``client_timeout``).
+        A hedged duplicate request is raced against a slow first attempt, and
+        timed-out calls are retried with a longer budget.
+        """
+        first_token_timeout, total_timeout = self.adaptive_timeouts(len(user_msg.content))
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return _run_sync(self._hedged_stream([user_msg], on_token, first_token_timeout, total_timeout))
+            except TimeoutError:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                print(f"[DEBUG] Streaming attempt {attempt + 1} timed out, retrying")
+                first_token_timeout *= 1.5
+                total_timeout *= 1.5
     
     
-    def go_to_work(self, user_instructions: str, input_data: dict):
+    def go_to_work(self, user_instructions: str, input_data: dict, on_token=None):
 
         _input_data = copy.deepcopy(input_data)
 
         parser = PydanticOutputParser(pydantic_object=Dimensions)
-        prompt = f"{user_instructions}\n\n{_input_data.get('chunks', [])}"
+        # Chunks tagged low_value (e.g. the references section) are not sent to the model
+        chunks = [c for c in _input_data.get('chunks', []) if not c.get('low_value')]
+        prompt = f"{user_instructions}\n\n{chunks}"
 
         if parser:
             prompt += "\n\n" + parser.get_format_instructions()
 
 
-        response = self.invoke(HumanMessage(content=prompt))
-        messages = response.get("messages", [])
-        
-        # Extract the text content from the last AI message
-        model_output_text = ""
-        if messages:
-            last_message = messages[-1]
-            model_output_text = last_message.content if hasattr(last_message, 'content') else str(last_message)
+        if self.streaming or on_token:
+            try:
+                model_output_text = self.stream_invoke(HumanMessage(content=prompt), on_token=on_token)
+            except TimeoutError as e:
+                return {"error": f"Model timed out: {e}", "raw_output": ""}
+        else:
+            response = self.invoke(HumanMessage(content=prompt))
+            messages = response.get("messages", [])
+
+            # Extract the text content from the last AI message
+            model_output_text = ""
+            if messages:
+                last_message = messages[-1]
+                model_output_text = last_message.content if hasattr(last_message, 'content') else str(last_message)
         
         if parser:
             try:
@@ -0,0 +1,199 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import cycle
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.messages import AIMessage
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from src.agents.dimension_extractor import DimensionExtractor
+
+
+DCM_CAPABILITIES = {
+    "connected customer",
+    "product development",
+    "synchronized planning",
+    "intelligent supply",
+    "smart operations",
+    "dynamic fulfillment",
+}
+
+# Label fields compared for self-consistency and baseline agreement
+LABEL_FIELDS = ("dcm_capability", "scor_process", "scrm_area")
+
+
+def _norm_label(value) -> str:
+    if not isinstance(value, str):
+        return ""
+    return value.strip().lower().replace("synchronised", "synchronized").replace("fulfilment", "fulfillment")
+
+
+@dataclass
+class TierStats:
+    papers: int = 0     # papers this tier attempted; latency is wall-clock per paper
+    calls: int = 0      # model calls, including self-consistency samples
+    accepted: int = 0
+    escalated: int = 0
+    total_latency_s: float = 0.0
+    est_input_tokens: int = 0
+    est_cost: float = 0.0
+
+    @property
+    def mean_latency_s(self) -> float:
+        return self.total_latency_s / self.papers if self.papers else 0.0
+
+
+@dataclass
+class ModelTier:
+    """One rung of the routing ladder.
+
+    Args:
+        name: Display name, e.g. "fast" or "strong".
+        model: The LLM model to use for this tier.
+        confidence_threshold: Minimum confidence to accept this tier's answer.
+        n_samples: Number of extraction runs used for self-consistency (1 disables it).
+        cost_per_1k_input_tokens: Price used for cost estimates in the stats.
+    """
+    name: str
+    model: Any
+    confidence_threshold: float = 0.7
+    n_samples: int = 1
+    cost_per_1k_input_tokens: float = 0.0
+    stats: TierStats = field(default_factory=TierStats)
+
+
+class TieredExtractor():
+    """Route papers through increasingly strong models, escalating only when unsure.
+
+    Exposes the same ``go_to_work`` interface as ``DimensionExtractor``. Each
+    tier's answer is scored for confidence from schema validity, agreement
+    between repeated samples and, if given, agreement with a baseline labeller
+    (e.g. retrieval over already-labelled papers). The last tier's answer is
+    always accepted.
+    """
+
+    def __init__(self, tiers: List[ModelTier], sys_prompt: str,
+                 baseline: Optional[Callable[[dict], Dict[str, str]]] = None,
+                 streaming: bool = False):
+        if not tiers:
+            raise ValueError("TieredExtractor needs at least one tier")
+
+        self.role       = "Tiered Dimension Extractor"
+        self.version    = "1.0"
+        self.tiers      = tiers
+        self.sys_prompt = sys_prompt
+        self.baseline   = baseline
+        self.streaming  = streaming
+        self._extractors: Dict[str, DimensionExtractor] = {}
+
+    def _extractor(self, tier: ModelTier) -> DimensionExtractor:
+        if tier.name not in self._extractors:
+            self._extractors[tier.name] = DimensionExtractor(
+                model=tier.model, sys_prompt=self.sys_prompt, streaming=self.streaming
+            )
+        return self._extractors[tier.name]
+
+    def _sample(self, extractor: DimensionExtractor, tier: ModelTier, user_instructions: str, input_data: dict, on_token):
+        """Run the tier's samples concurrently, so self-consistency costs tokens but not latency.
+
+        The first sample runs on the calling thread and is the only one streamed to ``on_token``.
+        """
+        n_extra = max(1, tier.n_samples) - 1
+        with ThreadPoolExecutor(max_workers=max(1, n_extra)) as pool:
+            extra = [
+                pool.submit(extractor.go_to_work, user_instructions=user_instructions, input_data=input_data)
+                for _ in range(n_extra)
+            ]
+            first = extractor.go_to_work(user_instructions=user_instructions, input_data=input_data, on_token=on_token)
+            return [first] + [future.result() for future in extra]
+
+    def score_confidence(self, samples: List[dict], input_data: dict) -> float:
+        """Score a tier's samples in [0, 1]; the first sample is the candidate answer."""
+        candidate = samples[0]
+        if "error" in candidate or _norm_label(candidate.get("dcm_capability")) not in DCM_CAPABILITIES:
+            return 0.0
+
+        signals = []
+        if len(samples) > 1:
+            agree = [
+                sum(_norm_label(s.get(f)) == _norm_label(candidate.get(f)) for s in samples) / len(samples)
+                for f in LABEL_FIELDS
+            ]
+            signals.append(sum(agree) / len(agree))
+
+        if self.baseline is not None:
+            reference = self.baseline(input_data) or {}
+            compared = [f for f in LABEL_FIELDS if reference.get(f)]
+            if compared:
+                signals.append(
+                    sum(_norm_label(reference[f]) == _norm_label(candidate.get(f)) for f in compared) / len(compared)
+                )
+
+        return sum(signals) / len(signals) if signals else 1.0
+
+    def go_to_work(self, user_instructions: str, input_data: dict, on_token=None, on_tier=None):
+        """Extract dimensions, escalating through the tiers.
+
+        ``on_token`` receives the streamed text of each tier's first sample;
+        ``on_tier(name)`` is called before each tier starts so a live preview
+        can be reset when a paper escalates.
+        """
+        n_chars = sum(len(c.get("text", "")) for c in input_data.get("chunks", []) if not c.get("low_value"))
+        est_tokens = (len(user_instructions) + n_chars) // 4
+
+        for i, tier in enumerate(self.tiers):
+            extractor = self._extractor(tier)
+            if on_tier:
+                on_tier(tier.name)
+            start = time.perf_counter()
+            samples = self._sample(extractor, tier, user_instructions, input_data, on_token)
+            elapsed = time.perf_counter() - start
+
+            tier.stats.papers += 1
+            tier.stats.calls += len(samples)
+            tier.stats.total_latency_s += elapsed
+            tier.stats.est_input_tokens += est_tokens * len(samples)
+            tier.stats.est_cost += est_tokens * len(samples) / 1000 * tier.cost_per_1k_input_tokens
+
+            confidence = self.score_confidence(samples, input_data)
+            is_last = i == len(self.tiers) - 1
+            print(f"[DEBUG] Tier {tier.name}: confidence={confidence:.2f} latency={elapsed:.2f}s")
+
+            if confidence >= tier.confidence_threshold or is_last:
+                tier.stats.accepted += 1
+                result = dict(samples[0])
+                result["routing"] = {"tier": tier.name, "confidence": round(confidence, 3)}
+                return result
+
+            tier.stats.escalated += 1
+
+    def get_stats(self) -> List[dict]:
+        """Per-tier paper, call, escalation, latency (per paper) and cost counters."""
+        return [
+            {
+                "tier": tier.name,
+                "papers": tier.stats.papers,
+                "calls": tier.stats.calls,
+                "accepted": tier.stats.accepted,
+                "escalated": tier.stats.escalated,
+                "mean_latency_s": round(tier.stats.mean_latency_s, 3),
+                "est_input_tokens": tier.stats.est_input_tokens,
+                "est_cost": round(tier.stats.est_cost, 4),
+            }
+            for tier in self.tiers
+        ]
+
+
+# --- Local fake models ---
+def make_fake_model(outputs: List[dict | str]) -> GenericFakeChatModel:
+    """Build an offline chat model that cycles through canned extraction outputs.
+
+    Dict outputs are serialized as JSON so they pass the Dimensions parser;
+    strings are returned verbatim (useful for simulating malformed answers).
+    """
+    messages = [
+        AIMessage(content=o if isinstance(o, str) else json.dumps(o))
+        for o in outputs
+    ]
+    return GenericFakeChatModel(messages=cycle(messages))
+
@@ -0,0 +1,164 @@
+import os
+import json
+import re
+from collections import Counter
+from typing import Dict, Optional, Tuple
+import pandas as pd
+
+# --- Paths ---
+ANALYTICS_PATH = "data/analytics.jsonl"
+OUTPUT_DIR = "data/output"
+
+UNKNOWN = "Unspecified"
+AGENTIC_PATTERN = re.compile(r"\bagent(s|ic)?\b|multi-agent|agent-based", re.IGNORECASE)
+
+
+# --- Helper functions ---
+def _label(value) -> str:
+    """Normalize a free-text label so spelling/casing variants share a bucket."""
+    if not isinstance(value, str) or not value.strip():
+        return UNKNOWN
+    return re.sub(r"\s+", " ", value.strip()).title()
+
+
+def extract_labels(analysis: dict) -> Optional[Tuple[str, str, str, str, bool]]:
+    """Reduce one analysis dict to the labels tracked by the aggregates.
+
+    Returns None for failed extractions. Accepts the legacy ``score_process``
+    key used by older output files.
+    """
+    if not analysis or "error" in analysis:
+        return None
+
+    scor = analysis.get("scor_process", analysis.get("score_process"))
+    agentic = bool(AGENTIC_PATTERN.search(analysis.get("ai_technology_nature") or ""))
+    return (
+        _label(analysis.get("dcm_capability")),
+        _label(scor),
+        _label(analysis.get("scrm_area")),
+        _label(analysis.get("industry_sector")),
+        agentic,
+    )
+
+
+class ExtractionAggregates():
+    """Cross-paper counters updated one paper at a time.
+
+    Each ``add`` is O(1), so the dashboard never rescans all results. Papers are
+    keyed by their chunk-store doc_id (the log's ``filename`` field); re-adding a
+    paper replaces its previous contribution.
+    """
+
+    def __init__(self):
+        self.papers: Dict[str, list] = {}
+        self.dcm_scor = Counter()
+        self.scrm = Counter()
+        self.sectors = Counter()
+        self.agentic = Counter()
+        self.failed = 0
+
+    def _apply(self, labels, sign: int):
+        dcm, scor, scrm, sector, agentic = labels
+        for counter, key in (
+            (self.dcm_scor, (dcm, scor)),
+            (self.scrm, scrm),
+            (self.sectors, sector),
+            (self.agentic, "Agentic" if agentic else "Non-agentic"),
+        ):
+            counter[key] += sign
+            if counter[key] <= 0:
+                del counter[key]
+
+    def add(self, filename: str, analysis: dict) -> bool:
+        """Fold one paper's analysis into the aggregates. Returns False if it failed."""
+        self.remove(filename)
+
+        labels = extract_labels(analysis)
+        if labels is None:
+            self.failed += 1
+            self.papers[filename] = None
+            return False
+
+        self._apply(labels, +1)
+        self.papers[filename] = list(labels)
+        return True
+
+    def remove(self, filename: str):
+        if filename not in self.papers:
+            return
+        labels = self.papers.pop(filename)
+        if labels is None:
+            self.failed -= 1
+        else:
+            self._apply(labels, -1)
+
+    # --- Views ---
+    @property
+    def n_papers(self) -> int:
+        return len(self.papers) - self.failed
+
+    def dcm_scor_matrix(self) -> pd.DataFrame:
+        if not self.dcm_scor:
+            return pd.DataFrame()
+        series = pd.Series(self.dcm_scor)
+        series.index = pd.MultiIndex.from_tuples(series.index, names=["DCM Capability", "SCOR Process"])
+        return series.unstack(fill_value=0).sort_index()
+
+    def distribution(self, name: str, top_n: Optional[int] = None) -> pd.Series:
+        counter = getattr(self, name)
+        return pd.Series(dict(counter.most_common(top_n)), name="Papers", dtype=int)
+
+    # --- Persistence ---
+    # The store is an append-only JSONL log of {"filename", "labels"} records;
+    # replaying it in order rebuilds the counters, later records win.
+    def record(self, filename: str, analysis: dict, path: str = ANALYTICS_PATH) -> bool:
+        """``add`` a paper and append its labels to the log in O(1)."""
+        ok = self.add(filename, analysis)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps({"filename": filename, "labels": self.papers[filename]}, ensure_ascii=False) + "\n")
+        return ok
+
+    def save(self, path: str = ANALYTICS_PATH):
+        """Rewrite the log with one record per paper (compaction)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            for filename, labels in self.papers.items():
+                f.write(json.dumps({"filename": filename, "labels": labels}, ensure_ascii=False) + "\n")
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str = ANALYTICS_PATH) -> "ExtractionAggregates":
+        aggregates = cls()
+        if not os.path.exists(path):
+            return aggregates
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                aggregates.remove(entry["filename"])
+                labels = entry["labels"]
+                aggregates.papers[entry["filename"]] = labels
+                if labels is None:
+                    aggregates.failed += 1
+                else:
+                    aggregates._apply(labels, +1)
+        return aggregates
+
+    @classmethod
+    def from_output_dir(cls, output_dir: str = OUTPUT_DIR) -> "ExtractionAggregates":
+        """One-off backfill from per-paper analysis files in ``output_dir``."""
+        aggregates = cls()
+        for file in sorted(os.listdir(output_dir)):
+            if not file.endswith(".json"):
+                continue
+            with open(os.path.join(output_dir, file), "r") as f:
+                aggregates.add(file.removesuffix(".json"), json.load(f))
+        return aggregates
+
+
+if __name__ == "__main__":
+    aggregates = ExtractionAggregates.from_output_dir()
+    aggregates.save()
+    print(f"Backfilled {aggregates.n_papers} papers ({aggregates.failed} failed) into {ANALYTICS_PATH}")
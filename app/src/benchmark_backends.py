@@ -0,0 +1,81 @@
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from tqdm import tqdm
+
+# Add app directory to path so this also runs as a script from the project root
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.pdf_backends import extract_pages, available_backends, DEFAULT_BACKEND
+
+# --- Paths ---
+PDF_DIR = "data/papers_raw"
+
+
+# --- Helper functions ---
+def _words(texts) -> Counter:
+    return Counter(re.findall(r"\w+", " ".join(texts).lower()))
+
+
+def text_fidelity(candidate, reference) -> float:
+    """Word-multiset F1 of a backend's output against the reference backend's output."""
+    cand, ref = _words(candidate), _words(reference)
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def benchmark(pdf_paths, backends=None, workers=None, reference=DEFAULT_BACKEND):
+    """Time every backend serially and in parallel on each PDF.
+
+    Returns one row per (file, backend, mode) with pages/s, chars and fidelity
+    relative to the ``reference`` backend's serial output.
+    """
+    backends = backends or available_backends()
+    rows = []
+
+    for pdf_path in tqdm(pdf_paths, desc="Benchmarking"):
+        reference_texts = extract_pages(pdf_path, backend=reference, workers=1)
+
+        for backend in backends:
+            for mode, n_workers in (("serial", 1), ("parallel", workers)):
+                start = time.perf_counter()
+                texts = extract_pages(pdf_path, backend=backend, workers=n_workers)
+                elapsed = time.perf_counter() - start
+
+                rows.append({
+                    "file": os.path.basename(pdf_path),
+                    "backend": backend,
+                    "mode": mode,
+                    "pages": len(texts),
+                    "seconds": round(elapsed, 3),
+                    "pages_per_s": round(len(texts) / elapsed, 1) if elapsed else float("inf"),
+                    "chars": sum(len(t) for t in texts),
+                    "fidelity": round(text_fidelity(texts, reference_texts), 3),
+                })
+
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare PDF text-extraction backends.")
+    parser.add_argument("pdfs", nargs="*", help="PDF files to benchmark (default: all PDFs in data/papers_raw)")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to compare (default: all installed)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for parallel mode (default: all usable cores)")
+    args = parser.parse_args()
+
+    pdf_paths = args.pdfs or [os.path.join(PDF_DIR, f) for f in sorted(os.listdir(PDF_DIR)) if f.endswith(".pdf")]
+    rows = benchmark(pdf_paths, backends=args.backends, workers=args.workers)
+
+    header = ["file", "backend", "mode", "pages", "seconds", "pages_per_s", "chars", "fidelity"]
+    print("\n" + " | ".join(header))
+    for row in rows:
+        print(" | ".join(str(row[h]) for h in header))
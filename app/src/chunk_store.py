@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import mmap
+import re
+import time
+import uuid
+from array import array
+from tqdm import tqdm
+
+# --- Paths ---
+STORE_DIR = "data/papers"
+
+# --- File layout ---
+# <doc_id>.chunks      line 0: JSON header {"generation", "metadata"}, lines 1..n: one JSON chunk per line
+# <doc_id>.chunks.idx  16-byte generation id, then little-endian uint64 byte offsets,
+#                      n_chunks + 2 entries (header start, every chunk start, end of file)
+# The generation id ties an index to the data file it was written with.
+CHUNKS_SUFFIX = ".chunks"
+INDEX_SUFFIX = ".chunks.idx"
+LEGACY_SUFFIX = ".json"
+GENERATION_BYTES = 16
+# Leftovers from the old NamedTemporaryFile upload path (tmpXXXXXXXX.pdf.json)
+TEMP_UPLOAD_PATTERN = re.compile(r"^tmp[a-z0-9_]{8}\.pdf")
+OPEN_RETRIES = 5
+
+
+# --- Helper functions ---
+def _chunks_path(store_dir: str, doc_id: str) -> str:
+    return os.path.join(store_dir, f"{doc_id}{CHUNKS_SUFFIX}")
+
+
+def _index_path(store_dir: str, doc_id: str) -> str:
+    return os.path.join(store_dir, f"{doc_id}{INDEX_SUFFIX}")
+
+
+def _dumps(obj) -> bytes:
+    """Compact single-line JSON encoding."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def write_chunks(data: dict, store_dir: str = STORE_DIR) -> str:
+    """Write a parsed document ({"metadata", "chunks"}) in the compact chunk format.
+
+    The data file and its offset index are written to temporary paths first and
+    renamed into place. The two renames are not atomic together, so both files
+    carry the same generation id and ``ChunkFile`` retries until they match.
+    """
+    doc_id = data["metadata"]["source"]["doc_id"]
+    os.makedirs(store_dir, exist_ok=True)
+    chunks_path = _chunks_path(store_dir, doc_id)
+    index_path = _index_path(store_dir, doc_id)
+
+    generation = uuid.uuid4()
+    offsets = array("Q")
+    with open(chunks_path + ".tmp", "wb") as f:
+        offsets.append(f.tell())
+        f.write(_dumps({"generation": generation.hex, "metadata": data.get("metadata", {})}))
+        for chunk in data.get("chunks", []):
+            offsets.append(f.tell())
+            f.write(_dumps(chunk))
+        offsets.append(f.tell())
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    with open(index_path + ".tmp", "wb") as f:
+        f.write(generation.bytes)
+        offsets.tofile(f)
+
+    os.replace(chunks_path + ".tmp", chunks_path)
+    os.replace(index_path + ".tmp", index_path)
+    return chunks_path
+
+
+class ChunkFile():
+    """Lazy, memory-mapped view over one document in the compact chunk format.
+
+    Chunks are decoded only when accessed, so iterating or indexing a document
+    never materializes the full chunk list.
+    """
+
+    def __init__(self, doc_id: str, store_dir: str = STORE_DIR):
+        self.doc_id = doc_id
+        self.path = _chunks_path(store_dir, doc_id)
+        self._metadata = None
+
+        # A writer may have replaced the data file but not yet the index; retry until they match
+        for attempt in range(OPEN_RETRIES):
+            with open(_index_path(store_dir, doc_id), "rb") as f:
+                generation = f.read(GENERATION_BYTES)
+                self._offsets = array("Q")
+                self._offsets.frombytes(f.read())
+            if sys.byteorder != "little":
+                self._offsets.byteswap()
+
+            self._file = open(self.path, "rb")
+            self._mm = None
+            try:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                # The header is always the first line; read it without trusting the (possibly stale) offsets
+                header = json.loads(self._mm.readline())
+                if header.get("generation") == uuid.UUID(bytes=generation).hex and self._offsets[-1] == len(self._mm):
+                    self._metadata = header["metadata"]
+                    return
+            except ValueError:
+                # Empty or partially written data file (mmap or JSON decoding failed)
+                pass
+
+            self.close()
+            time.sleep(0.01 * (attempt + 1))
+
+        raise RuntimeError(f"Chunk index for {doc_id} does not match its data file")
+
+    def _read(self, i: int):
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return json.loads(self._mm[start:end])
+
+    @property
+    def metadata(self) -> dict:
+        return self._metadata
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 2
+
+    def __getitem__(self, chunk_idx: int) -> dict:
+        n = len(self)
+        if chunk_idx < 0:
+            chunk_idx += n
+        if not 0 <= chunk_idx < n:
+            raise IndexError(f"chunk index {chunk_idx} out of range for {self.doc_id} ({n} chunks)")
+        return self._read(chunk_idx + 1)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._read(i + 1)
+
+    def to_dict(self) -> dict:
+        """Materialize the document in the legacy {"metadata", "chunks"} shape."""
+        return {"metadata": self.metadata, "chunks": list(self)}
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_chunks(doc_id: str, store_dir: str = STORE_DIR) -> ChunkFile:
+    return ChunkFile(doc_id, store_dir)
+
+
+def load_document(doc_id: str, store_dir: str = STORE_DIR) -> dict:
+    """Load a full document, preferring the compact format over legacy JSON."""
+    if os.path.exists(_index_path(store_dir, doc_id)):
+        with ChunkFile(doc_id, store_dir) as chunk_file:
+            return chunk_file.to_dict()
+
+    with open(os.path.join(store_dir, f"{doc_id}{LEGACY_SUFFIX}"), "r") as f:
+        return json.load(f)
+
+
+def list_documents(store_dir: str = STORE_DIR) -> list:
+    """Return the sorted doc_ids in the store, in compact or legacy JSON format."""
+    doc_ids = set()
+    for f in os.listdir(store_dir):
+        if TEMP_UPLOAD_PATTERN.match(f):
+            continue
+        if f.endswith(INDEX_SUFFIX):
+            doc_ids.add(f.removesuffix(INDEX_SUFFIX))
+        elif f.endswith(LEGACY_SUFFIX):
+            doc_ids.add(f.removesuffix(LEGACY_SUFFIX))
+    return sorted(doc_ids)
+
+
+def read_metadata(doc_id: str, store_dir: str = STORE_DIR) -> dict:
+    """Read only the metadata header line of a document."""
+    with open(_chunks_path(store_dir, doc_id), "rb") as f:
+        return json.loads(f.readline())["metadata"]
+
+
+def iter_corpus(store_dir: str = STORE_DIR):
+    """Yield (doc_id, chunk) for every chunk in the store.
+
+    Compact documents are streamed chunk by chunk; legacy JSON files are loaded whole.
+    """
+    for doc_id in list_documents(store_dir):
+        if not os.path.exists(_index_path(store_dir, doc_id)):
+            for chunk in load_document(doc_id, store_dir).get("chunks", []):
+                yield doc_id, chunk
+            continue
+        with ChunkFile(doc_id, store_dir) as chunk_file:
+            for chunk in chunk_file:
+                yield doc_id, chunk
+
+
+# --- Migration ---
+def migrate_legacy(store_dir: str = STORE_DIR, remove_legacy: bool = False, purge_temp: bool = True) -> int:
+    """Convert every legacy `<doc_id>.json` file in `store_dir` to the compact format.
+
+    Files left behind by the old temp-file upload path (``tmpXXXXXXXX.pdf.json``)
+    are keyed by a random name and are never migrated; ``purge_temp`` deletes them.
+    """
+    legacy_files = []
+    for f in sorted(os.listdir(store_dir)):
+        if not f.endswith(LEGACY_SUFFIX):
+            continue
+        if TEMP_UPLOAD_PATTERN.match(f):
+            if purge_temp:
+                os.unlink(os.path.join(store_dir, f))
+            continue
+        legacy_files.append(f)
+
+    migrated = 0
+    for file in tqdm(legacy_files, desc="Migrating"):
+        legacy_path = os.path.join(store_dir, file)
+        with open(legacy_path, "r") as f:
+            data = json.load(f)
+
+        # Older files are keyed by the file name only; trust it over stale metadata.
+        data.setdefault("metadata", {}).setdefault("source", {})["doc_id"] = file.removesuffix(LEGACY_SUFFIX)
+        write_chunks(data, store_dir)
+        migrated += 1
+
+        if remove_legacy:
+            os.unlink(legacy_path)
+
+    return migrated
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate parsed papers to the compact chunk format.")
+    parser.add_argument("--dir", default=STORE_DIR, help="Directory holding parsed paper JSON files")
+    parser.add_argument("--remove-legacy", action="store_true", help="Delete the JSON files after migration")
+    parser.add_argument("--keep-temp", action="store_true", help="Keep tmp*.pdf.json leftovers instead of deleting them")
+    args = parser.parse_args()
+
+    n = migrate_legacy(args.dir, remove_legacy=args.remove_legacy, purge_temp=not args.keep_temp)
+    print(f"\nMigrated {n} documents.")
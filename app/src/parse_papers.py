@@ -1,12 +1,21 @@
 from datetime import datetime, UTC
+from typing import BinaryIO
+import hashlib
 import os
-import json
 import re
+import sys
 import unicodedata
+from pathlib import Path
 from tqdm import tqdm
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+# Add app directory to path so this also runs as a script from the project root
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.chunk_store import write_chunks, read_metadata, load_document
+from src.pdf_backends import extract_pages, DEFAULT_BACKEND
+from src.search_index import append_document
+
 # --- Paths ---
 PDF_DIR = "data/papers_raw"
 OUTPUT_DIR = "data/papers"
@@ -21,6 +30,20 @@ text_splitter = RecursiveCharacterTextSplitter(
     separators=["\n\n", "\n", ".", " "]
 )
 
+# --- Cleaning setup ---
+# A line is boilerplate (running header/footer) if it repeats on this many pages
+REPEAT_MIN_PAGES = 3
+REPEAT_MIN_FRACTION = 0.3
+BOILERPLATE_MAX_LINE_LENGTH = 200
+EDGE_LINES = 3      # only the first/last lines of a page can be headers/footers
+# "drop" removes the references section; "tag" keeps it as chunks marked low_value
+REFERENCES_MODE = "tag"
+
+PAGE_NUMBER_PATTERN = re.compile(r"^[-–—\s]*\d{1,4}[-–—\s]*$")
+COPYRIGHT_PATTERN = re.compile(r"©|\(c\)\s*\d{4}|\bcopyright\b|all rights reserved", re.IGNORECASE)
+REFERENCES_HEADING = re.compile(r"^\s*(\d+\.?\s*)?(references|bibliography|works cited|literature cited)\s*:?\s*$", re.IGNORECASE)
+APPENDIX_HEADING = re.compile(r"^\s*(appendix|appendices)\b", re.IGNORECASE)
+
 # --- Helper functions ---
 def normalize_text(s: str) -> str:
     """Normalize whitespace and Unicode; remove line breaks."""
@@ -33,18 +56,89 @@ def normalize_text(s: str) -> str:
     return s.strip()
 
 
-def chunk_pdf(pdf_path: str):
-    """Load a PDF, split into text chunks, and save as JSON."""
-    loader = PyPDFLoader(pdf_path)
-    docs = loader.load()
-    joined_text = "\n".join(d.page_content for d in docs)
-    
+def _line_key(line: str) -> str:
+    """Match key for repeated lines.
+
+    Bare page numbers share one key, and leading/trailing numbers (page numbers,
+    ranges) are wildcarded in lines with other text. Other lines without letters
+    (table rows, equation numbers) stay literal.
+    """
+    key = re.sub(r"\s+", " ", line).strip().lower()
+    if PAGE_NUMBER_PATTERN.match(key):
+        return "<page>"
+    if not re.search(r"[^\d\W]", key):
+        return key
+    return re.sub(r"^[\d\W]*\d[\d\W]*|[\d\W]*\d[\d\W]*$", "#", key)
+
+
+def clean_pages(page_texts: list) -> tuple:
+    """Strip running headers/footers, copyright notices at page edges and the references section.
+
+    Returns:
+        ``(body_text, references_text, stats)`` where ``stats`` counts the lines,
+        characters and estimated tokens (~4 chars each) kept out of the model input.
+    """
+    pages = [[l for l in (text or "").splitlines() if l.strip()] for text in page_texts]
+
+    def edge_indices(lines):
+        return set(range(min(EDGE_LINES, len(lines)))) | set(range(max(0, len(lines) - EDGE_LINES), len(lines)))
+
+    # Lines at the top/bottom of a page that repeat across pages are running headers/footers
+    page_counts = {}
+    for lines in pages:
+        keys = {_line_key(lines[i]) for i in edge_indices(lines) if len(lines[i].strip()) <= BOILERPLATE_MAX_LINE_LENGTH}
+        for key in keys:
+            page_counts[key] = page_counts.get(key, 0) + 1
+    min_pages = max(REPEAT_MIN_PAGES, REPEAT_MIN_FRACTION * len(pages))
+    repeated = {key for key, count in page_counts.items() if count >= min_pages}
+
+    stats = {"boilerplate_lines": 0, "boilerplate_chars": 0, "reference_chars": 0}
+    kept = []
+    for lines in pages:
+        edges = edge_indices(lines)
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if i in edges and len(stripped) <= BOILERPLATE_MAX_LINE_LENGTH and (
+                _line_key(line) in repeated or COPYRIGHT_PATTERN.search(stripped)
+            ):
+                stats["boilerplate_lines"] += 1
+                stats["boilerplate_chars"] += len(line)
+                continue
+            kept.append(line)
+
+    # References: last matching heading in the second half, up to any appendix
+    body, references = kept, []
+    for i in range(len(kept) - 1, len(kept) // 2 - 1, -1):
+        if REFERENCES_HEADING.match(kept[i]):
+            end = next((j for j in range(i + 1, len(kept)) if APPENDIX_HEADING.match(kept[j])), len(kept))
+            body, references = kept[:i] + kept[end:], kept[i:end]
+            break
+    stats["reference_chars"] = sum(len(l) for l in references)
+
+    removed_chars = stats["boilerplate_chars"] + stats["reference_chars"]
+    stats["removed_chars"] = removed_chars
+    stats["removed_tokens_est"] = removed_chars // 4
+    stats["original_chars"] = sum(len(l) for lines in pages for l in lines)
+    return "\n".join(body), "\n".join(references), stats
+
+
+def build_document(page_texts: list, doc_id: str, content_hash: str | None = None, clean: bool = True) -> dict:
+    """Split page texts into normalized chunks and wrap them with source metadata.
+
+    With ``clean`` the text first goes through ``clean_pages``; the references
+    section is dropped or kept as chunks tagged ``low_value`` per ``REFERENCES_MODE``.
+    """
+    if clean:
+        joined_text, references_text, cleaning = clean_pages(page_texts)
+    else:
+        joined_text, references_text, cleaning = "\n".join(page_texts), "", None
+
     # Split into chunks
     chunks = text_splitter.split_text(joined_text)
+    low_value_chunks = text_splitter.split_text(references_text) if REFERENCES_MODE == "tag" and references_text else []
 
     # Prepare data structure
-    normalized_chunks   = [normalize_text(chunk) for chunk in chunks]
-    doc_id              = os.path.basename(pdf_path)
+    normalized_chunks   = [normalize_text(chunk) for chunk in chunks + low_value_chunks]
     timestamp           = datetime.now().isoformat()
     n_chunks            = len(normalized_chunks)
 
@@ -55,24 +149,92 @@ def chunk_pdf(pdf_path: str):
             "n_chunks": n_chunks
         }
     }
+    if content_hash:
+        metadata["source"]["content_hash"] = content_hash
+    if cleaning:
+        metadata["source"]["cleaning"] = cleaning
+        tqdm.write(
+            f"Cleaned {doc_id}: removed {cleaning['removed_chars']} chars "
+            f"(~{cleaning['removed_tokens_est']} tokens) of {cleaning['original_chars']}"
+        )
 
-    data = {
+    data_chunks = []
+    for i, chunk in enumerate(normalized_chunks):
+        entry = {"chunk_id": i, "text": chunk.strip()}
+        if i >= len(chunks):
+            entry["low_value"] = True
+        data_chunks.append(entry)
+
+    return {
         "metadata": metadata,
-        "chunks": [
-            {
-                "chunk_id": i,
-                "text": chunk.strip(),
-            }
-            for i, chunk in enumerate(normalized_chunks)
-        ]
+        "chunks": data_chunks
     }
-    
-    # Write JSON file
-    out_path = os.path.join(OUTPUT_DIR, f"{doc_id}.json")
-    with open(out_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    tqdm.write(f"Processed {doc_id} ({len(chunks)} chunks)")
+
+
+def chunk_pdf(pdf_path: str, backend: str = DEFAULT_BACKEND, workers: int | None = None):
+    """Load a PDF, split into text chunks, and save in the compact chunk format."""
+    page_texts = extract_pages(pdf_path, backend=backend, workers=workers)
+    doc_id = os.path.basename(pdf_path)
+
+    data = build_document(page_texts, doc_id)
+
+    # Write chunk file + offset index, then index the new chunks for search
+    write_chunks(data, OUTPUT_DIR)
+    append_document(data)
+
+    tqdm.write(f"Processed {doc_id} ({data['metadata']['source']['n_chunks']} chunks)")
+    return data
+
+
+def upload_doc_id(filename: str, content_hash: str) -> str:
+    """Document id for an upload: ``<name>.<hash prefix>.pdf``.
+
+    Different files uploaded under the same name get different ids, while
+    re-uploading identical bytes maps to the already parsed document.
+    """
+    name, ext = os.path.splitext(os.path.basename(filename))
+    return f"{name}.{content_hash[:12]}{ext or '.pdf'}"
+
+
+def chunk_pdf_bytes(pdf: bytes | BinaryIO, filename: str, persist: bool = True, output_dir: str = OUTPUT_DIR,
+                    backend: str = DEFAULT_BACKEND, workers: int | None = None):
+    """Parse a PDF from memory and split it into text chunks.
+
+    Args:
+        pdf: Raw PDF bytes or a binary stream (e.g. a Streamlit ``UploadedFile``).
+        filename: Original file name; with a content-hash prefix it forms the document id.
+        persist: Whether to save the parsed document to ``output_dir``.
+        output_dir: Directory for the compact chunk files.
+        backend: Text-extraction backend name (see ``src.pdf_backends``).
+        workers: Processes for page-range parallel extraction; defaults to all usable cores.
+
+    Returns:
+        The parsed document dict. When a persisted document with the same
+        document id already exists it is returned without re-parsing.
+    """
+    data_bytes = pdf if isinstance(pdf, (bytes, bytearray)) else pdf.read()
+    content_hash = hashlib.sha256(data_bytes).hexdigest()
+    doc_id = upload_doc_id(filename, content_hash)
+
+    if persist:
+        try:
+            cached = read_metadata(doc_id, output_dir)
+        except FileNotFoundError:
+            cached = None
+        if cached and cached.get("source", {}).get("content_hash") == content_hash:
+            tqdm.write(f"Reusing parsed {doc_id} (unchanged)")
+            return load_document(doc_id, output_dir)
+
+    page_texts = extract_pages(data_bytes, backend=backend, workers=workers)
+
+    data = build_document(page_texts, doc_id, content_hash=content_hash)
+    data["metadata"]["source"]["filename"] = os.path.basename(filename)
+
+    if persist:
+        write_chunks(data, output_dir)
+        append_document(data)
+
+    tqdm.write(f"Processed {doc_id} ({data['metadata']['source']['n_chunks']} chunks)")
     return data
 
 
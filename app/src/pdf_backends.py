@@ -0,0 +1,181 @@
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Type
+from pypdf import PdfReader
+
+# --- Parallel setup ---
+# Below this many pages per worker the process start-up cost outweighs the gain
+MIN_PAGES_PER_WORKER = 16
+
+PdfSource = str | bytes
+
+
+def _open_stream(source: PdfSource):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+
+class PdfBackend(ABC):
+    """Text-extraction backend interface.
+
+    Subclasses implement ``extract_range``; ``source`` is either a file path or
+    the raw PDF bytes, so every backend can be used from disk or from memory.
+    """
+
+    name = "base"
+
+    def page_count(self, source: PdfSource) -> int:
+        with _open_stream(source) as f:
+            return len(PdfReader(f).pages)
+
+    @abstractmethod
+    def extract_range(self, source: PdfSource, start: int, stop: int) -> List[str]:
+        """Return the text of pages ``start`` (inclusive) to ``stop`` (exclusive)."""
+
+
+class PyPdfBackend(PdfBackend):
+    """Pure-Python pypdf (same extractor as langchain's ``PyPDFLoader``)."""
+
+    name = "pypdf"
+
+    def extract_range(self, source: PdfSource, start: int, stop: int) -> List[str]:
+        with _open_stream(source) as f:
+            reader = PdfReader(f)
+            return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+class PdfiumBackend(PdfBackend):
+    """PDFium via ``pypdfium2``; native code, typically several times faster than pypdf."""
+
+    name = "pypdfium2"
+
+    def _open(self, source: PdfSource):
+        try:
+            import pypdfium2 as pdfium
+        except ImportError as e:
+            raise ImportError("The 'pypdfium2' backend requires: pip install pypdfium2") from e
+        return pdfium.PdfDocument(source)
+
+    def page_count(self, source: PdfSource) -> int:
+        pdf = self._open(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract_range(self, source: PdfSource, start: int, stop: int) -> List[str]:
+        pdf = self._open(source)
+        try:
+            texts = []
+            for i in range(start, stop):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+
+class PdfMinerBackend(PdfBackend):
+    """pdfminer.six layout analysis; slower, but robust on multi-column layouts."""
+
+    name = "pdfminer"
+
+    def extract_range(self, source: PdfSource, start: int, stop: int) -> List[str]:
+        try:
+            from pdfminer.high_level import extract_pages
+            from pdfminer.layout import LTTextContainer
+        except ImportError as e:
+            raise ImportError("The 'pdfminer' backend requires: pip install pdfminer.six") from e
+
+        with _open_stream(source) as f:
+            return [
+                "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+                for layout in extract_pages(f, page_numbers=range(start, stop))
+            ]
+
+
+BACKENDS: Dict[str, Type[PdfBackend]] = {
+    backend.name: backend
+    for backend in (PyPdfBackend, PdfiumBackend, PdfMinerBackend)
+}
+DEFAULT_BACKEND = PyPdfBackend.name
+
+
+def get_backend(name: str = DEFAULT_BACKEND) -> PdfBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose optional dependencies are installed."""
+    names = [DEFAULT_BACKEND]
+    for module, name in (("pypdfium2", PdfiumBackend.name), ("pdfminer", PdfMinerBackend.name)):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def usable_cpu_count() -> int:
+    """Cores this process may run on (respects CPU affinity, e.g. container cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _page_ranges(n_pages: int, workers: int | None) -> List[Tuple[int, int]]:
+    """Split ``n_pages`` into contiguous ranges, at most one per worker and at least MIN_PAGES_PER_WORKER pages each."""
+    workers = min(workers or usable_cpu_count(), n_pages // MIN_PAGES_PER_WORKER)
+    if workers <= 1:
+        return [(0, n_pages)]
+    bounds = [n_pages * i // workers for i in range(workers + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _extract_range(backend_name: str, source: PdfSource, start: int, stop: int) -> List[str]:
+    # Module-level so it can be pickled into worker processes
+    return get_backend(backend_name).extract_range(source, start, stop)
+
+
+def _extract_parallel(backend: str, path: str, ranges: List[Tuple[int, int]]) -> List[str]:
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(_extract_range, backend, path, start, stop) for start, stop in ranges]
+        return [text for future in futures for text in future.result()]
+
+
+def extract_pages(source: PdfSource, backend: str = DEFAULT_BACKEND, workers: int | None = None) -> List[str]:
+    """Extract the text of every page, splitting large documents into page ranges across processes.
+
+    Args:
+        source: Path to a PDF or its raw bytes.
+        backend: Name of a registered backend (see ``BACKENDS``).
+        workers: Number of processes; defaults to all usable cores. ``1`` forces serial extraction.
+
+    Returns:
+        One string per page, in page order.
+    """
+    pdf_backend = get_backend(backend)
+    n_pages = pdf_backend.page_count(source)
+
+    # Contiguous ranges keep page order and let each worker open the document once
+    ranges = _page_ranges(n_pages, workers)
+    if len(ranges) == 1:
+        return pdf_backend.extract_range(source, 0, n_pages)
+
+    if isinstance(source, (bytes, bytearray)):
+        # Spill in-memory PDFs to one temp file rather than pickling a copy to every worker
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "source.pdf")
+            with open(path, "wb") as f:
+                f.write(source)
+            return _extract_parallel(backend, path, ranges)
+    return _extract_parallel(backend, source, ranges)
+
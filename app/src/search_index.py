@@ -0,0 +1,295 @@
+import os
+import re
+import json
+import math
+import sys
+import threading
+import uuid
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+from tqdm import tqdm
+
+# Add app directory to path so this also runs as a script from the project root
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.chunk_store import STORE_DIR, open_chunks, list_documents, load_document
+
+# --- Paths ---
+INDEX_DIR = "data/search_index"
+VECTORS_FILE = "vectors.bin"
+ROWS_FILE = "rows.jsonl"
+LEGACY_VECTORS_FILE = "vectors.f32"
+
+# --- Vectorizer setup ---
+# Vectors are sparse, so the hashing space costs nothing to store; 2**20 dims keeps
+# collisions between the distinct unigrams/bigrams of a corpus rare
+N_DIMS = 2 ** 20
+# One (dim, weight) pair per non-zero entry; a row's entries are contiguous in VECTORS_FILE
+ENTRY_DTYPE = np.dtype([("dim", "<u4"), ("weight", "<f4")])
+# Posting segments appended by refresh are merged into one once there are more than this
+MAX_SEGMENTS = 8
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "their this to was were which with we our these those can also been such than".split()
+)
+
+
+# --- Helper functions ---
+def _features(text: str) -> Counter:
+    tokens = [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def embed(text: str, n_dims: int = N_DIMS) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse signed feature hashing of unigrams + bigrams with sublinear TF, L2-normalized.
+
+    Returns the sorted non-zero dims and their weights. Uses crc32 rather than
+    ``hash`` so vectors are stable across processes.
+    """
+    weights = {}
+    for feature, tf in _features(text).items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        dim = h % n_dims
+        weights[dim] = weights.get(dim, 0.0) + (1.0 + math.log(tf)) * (1 if h & 0x80000000 else -1)
+
+    dims = np.array(sorted(d for d, w in weights.items() if w), dtype=np.uint32)
+    values = np.array([weights[d] for d in dims.tolist()], dtype=np.float32)
+    norm = np.linalg.norm(values)
+    return dims, values / norm if norm else values
+
+
+def append_document(data: dict, index_dir: str = INDEX_DIR):
+    """Append one parsed document's chunks to the on-disk index.
+
+    Only writes the new rows; any older rows for the same doc_id are superseded
+    when the index is (re)loaded.
+    """
+    doc_id = data["metadata"]["source"]["doc_id"]
+    chunks = data.get("chunks", [])
+    if not chunks:
+        return
+
+    os.makedirs(index_dir, exist_ok=True)
+    embedded = [embed(c["text"]) for c in chunks]
+    version = data["metadata"]["source"].get("content_hash") or data["metadata"]["source"].get("timestamp")
+
+    # Vectors first: a row entry never points past the end of the vector file
+    with open(os.path.join(index_dir, VECTORS_FILE), "ab") as f:
+        offset = f.seek(0, os.SEEK_END) // ENTRY_DTYPE.itemsize
+        # Drop a torn entry left by an interrupted write so offsets stay aligned
+        f.truncate(offset * ENTRY_DTYPE.itemsize)
+        rows = []
+        for c, (dims, values) in zip(chunks, embedded):
+            entries = np.empty(len(dims), dtype=ENTRY_DTYPE)
+            entries["dim"], entries["weight"] = dims, values
+            entries.tofile(f)
+            rows.append({"doc_id": doc_id, "chunk_id": c["chunk_id"], "version": version,
+                         "offset": offset, "length": len(dims)})
+            offset += len(dims)
+
+    with open(os.path.join(index_dir, ROWS_FILE), "a") as f:
+        if f.tell() == 0:
+            # Identifies this build of the index, so readers notice a rebuild
+            f.write(json.dumps({"generation": uuid.uuid4().hex}) + "\n")
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class SearchIndex():
+    """TF-IDF cosine search over sparse hashed chunk vectors persisted in ``index_dir``.
+
+    Chunks are weighted by sublinear TF and queries by TF x IDF (SMART lnc.ltc).
+    Entries are held as posting segments sorted by dim, so a query only touches
+    the rows sharing one of its terms.
+
+    ``refresh`` picks up rows appended by ``append_document`` (e.g. from
+    ``chunk_pdf`` in another process) by reading only the new tail of the files,
+    and reloads from scratch if the files were rebuilt or truncated meanwhile.
+    One instance can be shared between threads (e.g. Streamlit sessions).
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, store_dir: str = STORE_DIR):
+        self.index_dir  = index_dir
+        self.store_dir  = store_dir
+        # Serializes refresh (which appends to the in-memory index) with searches
+        self._lock      = threading.RLock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self.rows: List[dict] = []
+        self.alive      = np.zeros(0, dtype=bool)
+        self._segments: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []  # (dims, row ids, weights)
+        self._latest: dict = {}     # doc_id -> version of its newest rows
+        self._doc_rows: dict = {}   # doc_id -> row indices of that version
+        self._rows_offset = 0
+        self._n_entries = 0         # vector entries referenced by the loaded rows
+        self._generation = None
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        rows_path = os.path.join(self.index_dir, ROWS_FILE)
+        vectors_path = os.path.join(self.index_dir, VECTORS_FILE)
+        try:
+            rows_stat, vectors_stat = os.stat(rows_path), os.stat(vectors_path)
+        except FileNotFoundError:
+            if self._rows_offset:
+                self._reset()
+            return
+
+        n_available = vectors_stat.st_size // ENTRY_DTYPE.itemsize
+        with open(rows_path, "rb") as f:
+            first = f.readline()
+            generation = json.loads(first).get("generation") if first.endswith(b"\n") else None
+            if generation != self._generation or rows_stat.st_size < self._rows_offset \
+                    or n_available < self._n_entries:
+                # Rebuilt or truncated since the last refresh: reload from scratch
+                self._reset()
+            if rows_stat.st_size == self._rows_offset:
+                return
+            f.seek(self._rows_offset)
+            tail = f.read()
+
+        new_rows = []
+        for line in tail.splitlines(keepends=True):
+            # A partially written last line is picked up on the next refresh
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                row = json.loads(line)
+                if "generation" in row:
+                    self._generation = row["generation"]
+                    self._rows_offset += len(line)
+                    continue
+                if "offset" not in row:
+                    raise RuntimeError(
+                        f"Search index in {self.index_dir} uses an old format; rebuild it from the project root with: python app/src/search_index.py"
+                    )
+                if row["offset"] + row["length"] > n_available:
+                    break
+                new_rows.append(row)
+            self._rows_offset += len(line)
+        if not new_rows:
+            return
+
+        lo = min(row["offset"] for row in new_rows)
+        hi = max(row["offset"] + row["length"] for row in new_rows)
+        with open(vectors_path, "rb") as f:
+            f.seek(lo * ENTRY_DTYPE.itemsize)
+            entries = np.fromfile(f, dtype=ENTRY_DTYPE, count=hi - lo)
+
+        start = len(self.rows)
+        offsets = np.array([row["offset"] for row in new_rows], dtype=np.int64) - lo
+        lengths = np.array([row["length"] for row in new_rows], dtype=np.int64)
+        # Gather each row's entries via its explicit offset (rows need not be contiguous)
+        starts = np.cumsum(lengths) - lengths
+        row_entries = entries[np.repeat(offsets - starts, lengths) + np.arange(lengths.sum())]
+        row_ids = np.repeat(np.arange(start, start + len(new_rows), dtype=np.int32), lengths)
+        order = np.argsort(row_entries["dim"])
+        self._segments.append((row_entries["dim"][order], row_ids[order], row_entries["weight"][order]))
+        if len(self._segments) > MAX_SEGMENTS:
+            self._merge_segments()
+
+        self.rows.extend(new_rows)
+        self.alive = np.concatenate([self.alive, np.ones(len(new_rows), dtype=bool)])
+        self._n_entries = max(self._n_entries, hi)
+
+        for i, row in enumerate(new_rows, start=start):
+            doc_id = row["doc_id"]
+            if self._latest.get(doc_id, row["version"]) != row["version"]:
+                # A newer version of this document supersedes its earlier rows
+                self.alive[self._doc_rows[doc_id]] = False
+                self._doc_rows[doc_id] = []
+            self._latest[doc_id] = row["version"]
+            self._doc_rows.setdefault(doc_id, []).append(i)
+
+    def _merge_segments(self):
+        dims, row_ids, weights = (np.concatenate(parts) for parts in zip(*self._segments))
+        order = np.argsort(dims)
+        self._segments = [(dims[order], row_ids[order], weights[order])]
+
+    def search(self, query: str, k: int = 10) -> List[dict]:
+        """Return the top-k chunks as dicts with doc_id, chunk_id, score and text."""
+        with self._lock:
+            self._refresh()
+            hits = self._rank(query, k)
+        # Chunk text is read from the store outside the lock
+        return [{**hit, "text": self._chunk_text(hit)} for hit in hits]
+
+    def _rank(self, query: str, k: int) -> List[dict]:
+        dims, values = embed(query)
+        if not len(self) or not len(dims):
+            return []
+
+        # Superseded rows still count towards document frequencies until the next rebuild
+        bounds = [
+            (np.searchsorted(seg[0], dims, "left"), np.searchsorted(seg[0], dims, "right"))
+            for seg in self._segments
+        ]
+        df = sum(hi - lo for lo, hi in bounds)
+        query_weights = values * (np.log((1 + len(self.rows)) / (1 + df)) + 1)
+        query_weights /= np.linalg.norm(query_weights)
+
+        scores = np.zeros(len(self.rows), dtype=np.float32)
+        for (_, row_ids, weights), (lo, hi) in zip(self._segments, bounds):
+            for j in np.flatnonzero(hi > lo):
+                # Each row holds a dim at most once, so the row ids in a posting list are unique
+                scores[row_ids[lo[j]:hi[j]]] += query_weights[j] * weights[lo[j]:hi[j]]
+
+        candidates = np.flatnonzero((scores > 0) & self.alive)
+        k = min(k, len(candidates))
+        if not k:
+            return []
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {"doc_id": self.rows[i]["doc_id"], "chunk_id": self.rows[i]["chunk_id"],
+             "version": self.rows[i]["version"], "score": float(scores[i])}
+            for i in top
+        ]
+
+    def _chunk_text(self, hit: dict) -> str:
+        try:
+            with open_chunks(hit["doc_id"], self.store_dir) as chunk_file:
+                return chunk_file[hit["chunk_id"]]["text"]
+        except FileNotFoundError:
+            # Legacy JSON document that has not been migrated yet, or one removed from the store
+            try:
+                chunks = load_document(hit["doc_id"], self.store_dir).get("chunks", [])
+            except FileNotFoundError:
+                chunks = []
+            return chunks[hit["chunk_id"]]["text"] if hit["chunk_id"] < len(chunks) else ""
+        except IndexError:
+            return ""
+
+
+def rebuild_index(store_dir: str = STORE_DIR, index_dir: str = INDEX_DIR) -> int:
+    """Rebuild the index from scratch over every document in the chunk store.
+
+    Open ``SearchIndex`` instances notice the new files and reload on their next refresh.
+    """
+    for name in (VECTORS_FILE, ROWS_FILE, LEGACY_VECTORS_FILE):
+        path = os.path.join(index_dir, name)
+        if os.path.exists(path):
+            os.unlink(path)
+
+    doc_ids = list_documents(store_dir)
+    for doc_id in tqdm(doc_ids, desc="Indexing"):
+        append_document(load_document(doc_id, store_dir), index_dir)
+    return len(doc_ids)
+
+
+if __name__ == "__main__":
+    n = rebuild_index()
+    print(f"\nIndexed {n} documents into {INDEX_DIR}.")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make `src` importable the same way app/main.py does
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
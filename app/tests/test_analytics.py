@@ -0,0 +1,81 @@
+from src.analytics import ExtractionAggregates, extract_labels
+
+
+def _analysis(dcm="Smart Operations", scor="Make", scrm="Operational Risk", sector="Manufacturing",
+              ai="multi-agent reinforcement learning"):
+    return {
+        "dcm_capability": dcm,
+        "scor_process": scor,
+        "scrm_area": scrm,
+        "industry_sector": sector,
+        "ai_technology_nature": ai,
+    }
+
+
+def test_add_replaces_a_papers_previous_contribution():
+    aggregates = ExtractionAggregates()
+    aggregates.add("a.pdf", _analysis())
+    aggregates.add("b.pdf", _analysis())
+
+    aggregates.add("a.pdf", _analysis(dcm="intelligent  supply", scor="source", ai="random forest"))
+
+    assert aggregates.n_papers == 2
+    assert aggregates.dcm_scor == {("Smart Operations", "Make"): 1, ("Intelligent Supply", "Source"): 1}
+    assert aggregates.agentic == {"Agentic": 1, "Non-agentic": 1}
+
+    aggregates.remove("b.pdf")
+    aggregates.remove("missing.pdf")
+    assert aggregates.dcm_scor == {("Intelligent Supply", "Source"): 1}
+    assert "Smart Operations" not in aggregates.dcm_scor_matrix().index
+
+
+def test_failed_extractions_are_counted_separately():
+    aggregates = ExtractionAggregates()
+
+    assert aggregates.add("a.pdf", {"error": "timeout"}) is False
+    assert (aggregates.n_papers, aggregates.failed) == (0, 1)
+
+    assert aggregates.add("a.pdf", _analysis()) is True
+    assert (aggregates.n_papers, aggregates.failed) == (1, 0)
+
+    aggregates.add("a.pdf", None)
+    assert (aggregates.n_papers, aggregates.failed) == (0, 1)
+    assert not aggregates.dcm_scor and not aggregates.sectors
+
+
+def test_record_log_replays_with_later_entries_winning(tmp_path):
+    path = str(tmp_path / "analytics.jsonl")
+    aggregates = ExtractionAggregates()
+    aggregates.record("a.pdf", _analysis(), path)
+    aggregates.record("b.pdf", {"error": "timeout"}, path)
+    aggregates.record("a.pdf", _analysis(sector="retail"), path)
+    aggregates.record("b.pdf", _analysis(scrm=None), path)
+
+    loaded = ExtractionAggregates.load(path)
+
+    assert loaded.papers == aggregates.papers
+    assert loaded.sectors == {"Retail": 1, "Manufacturing": 1}
+    assert loaded.scrm == {"Operational Risk": 1, "Unspecified": 1}
+    assert loaded.failed == 0
+
+    aggregates.save(path)
+    assert len(open(path).readlines()) == 2
+    assert ExtractionAggregates.load(path).papers == aggregates.papers
+
+
+def test_dcm_scor_matrix_shape_and_legacy_score_process_key():
+    aggregates = ExtractionAggregates()
+    aggregates.add("a.pdf", _analysis("Smart Operations", "Make"))
+    aggregates.add("b.pdf", _analysis("Smart Operations", "Deliver"))
+    legacy = _analysis("Connected Customer")
+    legacy["score_process"] = legacy.pop("scor_process")
+    aggregates.add("c.pdf", legacy)
+
+    matrix = aggregates.dcm_scor_matrix()
+
+    assert matrix.shape == (2, 2)
+    assert list(matrix.index) == ["Connected Customer", "Smart Operations"]
+    assert matrix.loc["Connected Customer", "Make"] == 1
+    assert matrix.loc["Connected Customer", "Deliver"] == 0
+    assert extract_labels(legacy)[1] == "Make"
+    assert ExtractionAggregates().dcm_scor_matrix().empty
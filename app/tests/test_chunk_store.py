@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import pytest
+from src.chunk_store import (
+    ChunkFile, list_documents, load_document, migrate_legacy, read_metadata, write_chunks,
+)
+
+
+def _doc(doc_id, n_chunks=3, text="chunk"):
+    return {
+        "metadata": {"source": {"doc_id": doc_id, "n_chunks": n_chunks}},
+        "chunks": [{"chunk_id": i, "text": f"{text} {i}"} for i in range(n_chunks)],
+    }
+
+
+def test_round_trip_and_lazy_access(tmp_path):
+    write_chunks(_doc("a.pdf"), str(tmp_path))
+
+    with ChunkFile("a.pdf", str(tmp_path)) as chunk_file:
+        assert len(chunk_file) == 3
+        assert chunk_file[-1] == {"chunk_id": 2, "text": "chunk 2"}
+        assert chunk_file.metadata == _doc("a.pdf")["metadata"]
+    assert load_document("a.pdf", str(tmp_path)) == _doc("a.pdf")
+    assert read_metadata("a.pdf", str(tmp_path)) == _doc("a.pdf")["metadata"]
+
+
+@pytest.mark.parametrize("old_chunks, new_chunks", [(3, 3), (3, 12), (3, 120), (12, 3)])
+def test_index_from_another_write_is_rejected(tmp_path, old_chunks, new_chunks):
+    write_chunks(_doc("a.pdf", n_chunks=old_chunks, text="old"), str(tmp_path))
+    stale_index = tmp_path / "a.pdf.chunks.idx.stale"
+    shutil.copy(tmp_path / "a.pdf.chunks.idx", stale_index)
+
+    # Simulate a reader opening between the data and index renames of a rewrite
+    write_chunks(_doc("a.pdf", n_chunks=new_chunks, text="new"), str(tmp_path))
+    os.replace(stale_index, tmp_path / "a.pdf.chunks.idx")
+
+    n_open_files = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+    with pytest.raises(RuntimeError):
+        ChunkFile("a.pdf", str(tmp_path))
+    if n_open_files is not None:
+        assert len(os.listdir("/proc/self/fd")) == n_open_files
+
+
+def test_legacy_documents_are_listed_and_loadable(tmp_path):
+    with open(tmp_path / "b.pdf.json", "w") as f:
+        json.dump(_doc("b.pdf"), f, indent=2)
+    write_chunks(_doc("a.pdf"), str(tmp_path))
+
+    assert list_documents(str(tmp_path)) == ["a.pdf", "b.pdf"]
+    assert load_document("b.pdf", str(tmp_path)) == _doc("b.pdf")
+
+    assert migrate_legacy(str(tmp_path)) == 1
+    with ChunkFile("b.pdf", str(tmp_path)) as chunk_file:
+        assert chunk_file.to_dict() == _doc("b.pdf")
+
+
+def test_temp_upload_leftovers_are_skipped_and_purged(tmp_path):
+    for name in ("tmp41140hme.pdf.json", "c.pdf.json"):
+        with open(tmp_path / name, "w") as f:
+            json.dump(_doc(name.removesuffix(".json")), f)
+
+    assert list_documents(str(tmp_path)) == ["c.pdf"]
+    assert migrate_legacy(str(tmp_path)) == 1
+    assert not (tmp_path / "tmp41140hme.pdf.json").exists()
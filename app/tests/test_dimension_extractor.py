@@ -0,0 +1,76 @@
+import asyncio
+import json
+from itertools import cycle
+from langchain_core.messages import AIMessage
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from src.agents.dimension_extractor import DimensionExtractor
+
+GOOD = {
+    "dcm_capability": "Smart Operations",
+    "scor_process": "Make",
+    "scrm_area": None,
+    "problem_description": "Scheduling under machine breakdowns.",
+    "ai_technology_nature": "reinforcement learning",
+    "industry_sector": "manufacturing",
+}
+PAPER = {"metadata": {}, "chunks": [{"chunk_id": 0, "text": "A paper about scheduling."}]}
+
+
+class StallingModel(GenericFakeChatModel):
+    """Fake model whose first ``n_stalls`` streams never produce a token."""
+
+    n_stalls: int = 1
+    calls: int = 0
+    cancelled: int = 0
+
+    async def _astream(self, *args, **kwargs):
+        self.calls += 1
+        try:
+            if self.calls <= self.n_stalls:
+                await asyncio.sleep(60)
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def _fast_timeouts(extractor):
+    extractor.FIRST_TOKEN_TIMEOUT_BASE = 0.4
+    extractor.FIRST_TOKEN_TIMEOUT_PER_10K = 0.0
+    return extractor
+
+
+def test_streaming_tokens_reach_on_token():
+    model = GenericFakeChatModel(messages=cycle([AIMessage(content=json.dumps(GOOD))]))
+    extractor = DimensionExtractor(model=model, sys_prompt="Extract dimensions.", streaming=True)
+
+    tokens = []
+    result = extractor.go_to_work("Please analyse:", PAPER, on_token=tokens.append)
+
+    assert result == GOOD
+    assert len(tokens) > 1
+    assert json.loads("".join(tokens)) == GOOD
+
+
+def test_hedged_request_wins_and_stalled_attempt_is_cancelled():
+    model = StallingModel(messages=cycle([AIMessage(content=json.dumps(GOOD))]), n_stalls=1)
+    extractor = _fast_timeouts(DimensionExtractor(model=model, sys_prompt="Extract dimensions.", streaming=True))
+
+    tokens = []
+    result = extractor.go_to_work("Please analyse:", PAPER, on_token=tokens.append)
+
+    assert result == GOOD
+    assert model.calls == 2
+    assert model.cancelled == 1
+
+
+def test_timeout_returns_error_after_retries():
+    model = StallingModel(messages=cycle([AIMessage(content=json.dumps(GOOD))]), n_stalls=100)
+    extractor = _fast_timeouts(DimensionExtractor(model=model, sys_prompt="Extract dimensions.", streaming=True))
+
+    result = extractor.go_to_work("Please analyse:", PAPER)
+
+    assert "timed out" in result["error"]
+    # Every attempt (original + hedge, per try) was cancelled rather than left running
+    assert model.cancelled == model.calls == 2 * (extractor.MAX_RETRIES + 1)
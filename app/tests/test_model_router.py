@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+import pytest
+from src.agents import model_router
+from src.agents.model_router import ModelTier, TieredExtractor, make_fake_model
+
+PAPER = {"metadata": {}, "chunks": [{"chunk_id": 0, "text": "A paper about scheduling."}]}
+
+
+def _dims(dcm="Smart Operations", scor="Make"):
+    return {
+        "dcm_capability": dcm,
+        "scor_process": scor,
+        "scrm_area": None,
+        "problem_description": "Scheduling under machine breakdowns.",
+        "ai_technology_nature": "reinforcement learning",
+        "industry_sector": "manufacturing",
+    }
+
+
+def _router(fast_outputs, strong_outputs=None, n_samples=3, **kwargs):
+    tiers = [
+        ModelTier("fast", make_fake_model(fast_outputs), confidence_threshold=0.7, n_samples=n_samples,
+                  cost_per_1k_input_tokens=0.001),
+        ModelTier("strong", make_fake_model(strong_outputs or [_dims()]), confidence_threshold=0.0,
+                  cost_per_1k_input_tokens=0.003),
+    ]
+    return TieredExtractor(tiers=tiers, sys_prompt="Extract dimensions.", **kwargs)
+
+
+def _stats(router):
+    return {row["tier"]: row for row in router.get_stats()}
+
+
+def test_consistent_fast_answers_are_accepted_without_escalation():
+    router = _router([_dims()])
+
+    result = router.go_to_work("Please analyse:", PAPER)
+
+    assert result["routing"] == {"tier": "fast", "confidence": 1.0}
+    stats = _stats(router)
+    assert stats["fast"]["calls"] == 3 and stats["fast"]["accepted"] == 1
+    assert stats["strong"]["calls"] == 0
+
+
+def test_ambiguous_papers_escalate_when_samples_disagree():
+    router = _router([
+        _dims("Smart Operations", "Make"),
+        _dims("Intelligent Supply", "Source"),
+        _dims("Synchronized Planning", "Plan"),
+    ])
+
+    result = router.go_to_work("Please analyse:", PAPER)
+
+    assert result["routing"]["tier"] == "strong"
+    assert _stats(router)["fast"]["escalated"] == 1
+
+
+@pytest.mark.parametrize("bad_output", ["not json", _dims(dcm="Quantum Logistics")])
+def test_invalid_fast_answers_escalate(bad_output):
+    router = _router([bad_output], n_samples=1)
+
+    assert router.go_to_work("Please analyse:", PAPER)["routing"]["tier"] == "strong"
+
+
+def test_baseline_disagreement_escalates():
+    router = _router([_dims()], n_samples=1, baseline=lambda paper: _dims("Intelligent Supply", "Source"))
+
+    assert router.go_to_work("Please analyse:", PAPER)["routing"]["tier"] == "strong"
+
+
+def test_streaming_callbacks_are_forwarded_per_tier():
+    router = _router(["not json"], n_samples=1, streaming=True)
+    tiers, tokens = [], []
+
+    router.go_to_work("Please analyse:", PAPER, on_token=tokens.append, on_tier=tiers.append)
+
+    assert tiers == ["fast", "strong"]
+    assert "not" in "".join(tokens)
+
+
+def test_mean_latency_is_per_paper_not_per_sample(monkeypatch):
+    clock = iter([0.0, 0.3, 1.0, 1.5])
+    monkeypatch.setattr(model_router, "time", SimpleNamespace(perf_counter=lambda: next(clock)))
+    router = _router([_dims()])
+
+    router.go_to_work("Please analyse:", PAPER)
+    router.go_to_work("Please analyse:", PAPER)
+
+    stats = _stats(router)["fast"]
+    assert (stats["papers"], stats["calls"]) == (2, 6)
+    assert stats["mean_latency_s"] == pytest.approx(0.4)
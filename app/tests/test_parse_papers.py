@@ -0,0 +1,64 @@
+from src.parse_papers import build_document, clean_pages, upload_doc_id
+
+
+def _pages(n_pages=6, with_references=True):
+    pages = []
+    for p in range(n_pages):
+        body = [f"Sentence {w} on page {p} discussing {topic}." for w, topic in
+                zip(("one", "two", "three", "four"), ("demand", "supply", "agents", "risk"))]
+        lines = [f"Journal of Supply Chains 12 (2024) {100 + p}"] + body
+        if with_references and p == n_pages - 1:
+            lines += ["References", "[1] Smith J. Multi-agent planning. 2020.", "[2] Doe A. Inventory. 2021."]
+        lines += ["© 2024 Elsevier Ltd. All rights reserved.", str(p + 1)]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def test_clean_pages_strips_running_headers_footers_and_copyright():
+    body, references, stats = clean_pages(_pages(with_references=False))
+
+    assert "Journal of Supply Chains" not in body
+    assert "Elsevier" not in body
+    assert "Sentence four on page 5 discussing risk." in body
+    assert references == ""
+    assert stats["boilerplate_lines"] == 6 * 3
+    assert stats["removed_tokens_est"] == stats["removed_chars"] // 4
+
+
+def test_clean_pages_keeps_body_copyright_mentions_and_numeric_edge_lines():
+    pages = _pages(with_references=False)
+    pages[2] = pages[2].replace("Sentence two on page 2", "Copyright law shapes data sharing on page 2")
+    for p, row in enumerate(("0.91 0.88 0.93", "(4)", "12.5 / 13.1", "2019 2020 2021", "(7)", "3.3 4.4")):
+        pages[p] = f"{row}\n{pages[p]}"
+
+    body, _, stats = clean_pages(pages)
+
+    assert "Copyright law shapes data sharing on page 2" in body
+    for row in ("0.91 0.88 0.93", "(4)", "12.5 / 13.1", "2019 2020 2021", "(7)", "3.3 4.4"):
+        assert row in body.splitlines()
+    assert stats["boilerplate_lines"] == 6 * 3
+
+
+def test_clean_pages_sets_aside_references_section():
+    body, references, stats = clean_pages(_pages())
+
+    assert references.startswith("References")
+    assert "Smith J." not in body
+    assert stats["reference_chars"] == len(references.replace("\n", ""))
+
+
+def test_build_document_tags_reference_chunks_low_value():
+    data = build_document(_pages(), "paper.pdf")
+
+    low_value = [c for c in data["chunks"] if c.get("low_value")]
+    assert low_value and "Smith J." in low_value[0]["text"]
+    assert not any("Smith J." in c["text"] for c in data["chunks"] if not c.get("low_value"))
+    assert data["metadata"]["source"]["cleaning"]["removed_chars"] > 0
+
+
+def test_upload_doc_id_includes_content_hash():
+    a = upload_doc_id("paper.pdf", "a" * 64)
+    b = upload_doc_id("paper.pdf", "b" * 64)
+
+    assert a == "paper.aaaaaaaaaaaa.pdf"
+    assert a != b
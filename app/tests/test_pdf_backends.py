@@ -0,0 +1,89 @@
+from typing import List
+import pytest
+from src import pdf_backends
+from src.pdf_backends import PdfBackend, _page_ranges, extract_pages, get_backend
+
+
+def _make_pdf(n_pages: int) -> bytes:
+    """Minimal PDF with one line of text ("Page <i> body") per page."""
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % n_pages,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page_id in enumerate(page_ids):
+        content = b"BT /F1 12 Tf 72 720 Td (Page %d body) Tj ET" % i
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+    pdf, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    # Let a short test document be split across workers
+    monkeypatch.setattr(pdf_backends, "MIN_PAGES_PER_WORKER", 2)
+
+
+def test_page_ranges_are_contiguous_and_clamped():
+    per_worker = pdf_backends.MIN_PAGES_PER_WORKER
+
+    assert _page_ranges(100, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    assert _page_ranges(3 * per_worker, 8) == [(0, per_worker), (per_worker, 2 * per_worker), (2 * per_worker, 3 * per_worker)]
+    assert _page_ranges(2 * per_worker - 1, 8) == [(0, 2 * per_worker - 1)]
+    assert _page_ranges(100, 1) == [(0, 100)]
+
+
+def test_parallel_extraction_matches_serial_in_order(tmp_path, small_ranges):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(_make_pdf(12))
+
+    serial = extract_pages(str(path), workers=1)
+    assert len(serial) == 12
+    assert all(f"Page {i} body" in text for i, text in enumerate(serial))
+    assert extract_pages(str(path), workers=4) == serial
+
+
+def test_parallel_bytes_are_shared_through_a_file(monkeypatch, small_ranges):
+    pdf = _make_pdf(8)
+    sources = []
+    extract_parallel = pdf_backends._extract_parallel
+
+    def spy(backend, path, ranges):
+        sources.append(path)
+        return extract_parallel(backend, path, ranges)
+
+    monkeypatch.setattr(pdf_backends, "_extract_parallel", spy)
+
+    assert extract_pages(pdf, workers=2) == extract_pages(pdf, workers=1)
+    assert len(sources) == 1 and isinstance(sources[0], str)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown PDF backend"):
+        get_backend("ocr")
+
+
+def test_backend_without_extract_range_cannot_be_instantiated():
+    class Incomplete(PdfBackend):
+        name = "incomplete"
+
+    class Complete(Incomplete):
+        def extract_range(self, source, start: int, stop: int) -> List[str]:
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert Complete().extract_range(b"", 0, 0) == []
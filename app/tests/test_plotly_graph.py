@@ -0,0 +1,76 @@
+import networkx as nx
+import pytest
+from ui.plotly_graph import build_graph_figure, clear_figure_cache, update_graph_figure
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_figure_cache()
+    yield
+    clear_figure_cache()
+
+
+def _graph():
+    graph = nx.DiGraph()
+    for i, xy in enumerate([(0, 0), (1, 0), (2, 1), (3, 0)]):
+        graph.add_node(f"n{i}", pos=xy, process_time=1.5, capacity=2)
+    for i in range(3):
+        graph.add_edge(f"n{i}", f"n{i + 1}", color="gray")
+    return graph
+
+
+def test_identical_inputs_hit_the_cache():
+    products = [{"route": ["n0", "n1", "n2"], "color": "red"}]
+
+    assert build_graph_figure(_graph(), products) is build_graph_figure(_graph(), products)
+
+
+def test_later_build_does_not_change_earlier_figure():
+    graph = _graph()
+    red = build_graph_figure(graph, [{"route": ["n0", "n1", "n2"], "color": "red"}])
+    expected = red.to_dict()
+
+    blue = build_graph_figure(graph, [{"route": ["n1", "n3"], "color": "blue"}])
+
+    assert blue is not red
+    assert red.to_dict() == expected
+    assert build_graph_figure(graph, [{"route": ["n0", "n1", "n2"], "color": "red"}]) is red
+
+
+def test_patched_figure_matches_full_rebuild():
+    graph = _graph()
+    products = [{"route": ["n0", "n1", "n2"], "color": "red"}, {"route": ["n1", "n3"], "color": "blue"}]
+    fig = build_graph_figure(graph, products, use_cache=False)
+
+    graph.edges["n1", "n2"]["color"] = "green"
+    graph.nodes["n3"]["capacity"] = 7
+    products[1] = {"route": ["n2", "n3", "n0"], "color": "orange"}
+    patched = update_graph_figure(fig, graph, products)
+
+    assert patched is fig
+    assert patched.to_dict() == build_graph_figure(graph, products, use_cache=False).to_dict()
+
+
+def test_patching_a_cached_figure_returns_a_copy():
+    graph = _graph()
+    products = [{"route": ["n0", "n1", "n2"], "color": "red"}]
+    cached = build_graph_figure(graph, products)
+    expected = cached.to_dict()
+
+    patched = update_graph_figure(cached, graph, [{"route": ["n0", "n1", "n2"], "color": "blue"}])
+
+    assert patched is not cached
+    assert cached.to_dict() == expected
+    assert patched.data[-1].marker.color == "blue"
+    assert update_graph_figure(patched, graph, products) is patched
+
+
+def test_structural_change_rebuilds():
+    graph = _graph()
+    fig = build_graph_figure(graph)
+
+    graph.add_edge("n3", "n0", color="gray")
+    rebuilt = update_graph_figure(fig, graph)
+
+    assert rebuilt is not fig
+    assert len(rebuilt.data) == len(fig.data) + 1
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.chunk_store import write_chunks
+from src.search_index import ENTRY_DTYPE, ROWS_FILE, VECTORS_FILE, SearchIndex, append_document, rebuild_index
+
+TEXTS = [
+    "Multi-agent reinforcement learning for inventory replenishment in retail supply chains.",
+    "Blockchain traceability improves transparency for food supply chain risk management.",
+    "Digital twins of production lines support predictive maintenance in smart factories.",
+]
+
+
+def _doc(doc_id, texts, version="v1"):
+    return {
+        "metadata": {"source": {"doc_id": doc_id, "content_hash": version}},
+        "chunks": [{"chunk_id": i, "text": t} for i, t in enumerate(texts)],
+    }
+
+
+def _add(store, index, doc):
+    write_chunks(doc, str(store))
+    append_document(doc, str(index))
+
+
+def test_search_ranks_matching_chunk_and_supersedes_old_versions(tmp_path):
+    store, index = tmp_path / "store", tmp_path / "index"
+    _add(store, index, _doc("a.pdf", TEXTS))
+    search = SearchIndex(str(index), str(store))
+
+    hits = search.search("digital twin predictive maintenance")
+    assert (hits[0]["doc_id"], hits[0]["chunk_id"]) == ("a.pdf", 2)
+    assert hits[0]["text"] == TEXTS[2]
+    assert search.search("quantum cryptography") == []
+
+    _add(store, index, _doc("a.pdf", TEXTS[:1], version="v2"))
+    search.refresh()
+    assert len(search) == 1
+    assert [h["version"] for h in search.search("supply chain")] == ["v2"]
+
+
+def test_rows_use_explicit_offsets_after_torn_vector_write(tmp_path):
+    store, clean, torn = tmp_path / "store", tmp_path / "clean", tmp_path / "torn"
+    for index in (clean, torn):
+        _add(store, index, _doc("a.pdf", TEXTS[:1]))
+    with open(torn / VECTORS_FILE, "ab") as f:
+        f.write(b"\x00" * (ENTRY_DTYPE.itemsize + 3))   # interrupted append, no row written
+    for index in (clean, torn):
+        _add(store, index, _doc("b.pdf", TEXTS[1:2]))
+
+    expected = SearchIndex(str(clean), str(store)).search("blockchain traceability")
+    assert SearchIndex(str(torn), str(store)).search("blockchain traceability") == expected
+    assert expected[0]["doc_id"] == "b.pdf"
+
+
+def test_refresh_reloads_after_rebuild_or_truncation(tmp_path):
+    store, index = tmp_path / "store", tmp_path / "index"
+    for i, text in enumerate(TEXTS):
+        _add(store, index, _doc(f"{i}.pdf", [text]))
+    search = SearchIndex(str(index), str(store))
+    assert len(search) == 3
+
+    os.unlink(store / "1.pdf.chunks")
+    os.unlink(store / "1.pdf.chunks.idx")
+    rebuild_index(str(store), str(index))
+    assert search.search("blockchain traceability") == []
+    assert len(search) == 2
+
+    with open(index / VECTORS_FILE, "r+b") as f:
+        f.truncate(ENTRY_DTYPE.itemsize)
+    search.refresh()
+    assert len(search) == 0
+
+    os.unlink(index / ROWS_FILE)
+    search.refresh()
+    assert search.rows == []
+
+
+def test_concurrent_searches_load_each_row_once(tmp_path):
+    store, index = tmp_path / "store", tmp_path / "index"
+    search = SearchIndex(str(index), str(store))
+    for i in range(50):
+        _add(store, index, _doc(f"{i}.pdf", TEXTS))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: search.search("supply chain", k=200), range(16)))
+
+    assert len(search.rows) == len(search) == 150
+    assert all(len(hits) == 100 for hits in results)
@@ -1,8 +1,104 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Tuple
 import plotly.graph_objects as go
 import networkx as nx
 
+# --- Figure cache ---
+FIGURE_CACHE_SIZE = 32
+_FIGURE_CACHE: "OrderedDict[str, go.Figure]" = OrderedDict()
+
+
+@dataclass
+class _FigureState:
+    """Bookkeeping attached to a built figure so it can be patched in place."""
+    structure: Tuple
+    edge_colors: Dict[Tuple[Any, Any], str]
+    edge_trace_indices: Dict[Tuple[Any, Any], int]
+    node_attrs: Dict[Any, Tuple]
+    node_trace_index: int
+    products: List[Tuple[Tuple, str]]
+    product_trace_indices: List[int]
+    shared: bool = False    # held by the figure cache; never patched in place
+
+
+def _valid_products(products: List[Dict[str, Any]] | None) -> List[Dict[str, Any]]:
+    # Normalise products to a list and filter out invalid routes.
+    return [p for p in (products or []) if len(p.get("route", [])) >= 2]
+
+
+def _node_hover_text(node_id: Any, node_data: Dict[str, Any]) -> str:
+    process_time_raw = node_data.get("process_time")
+    capacity = node_data.get("capacity", "N/A")
+
+    # Convert process_time from minutes (float) to mm:ss format
+    if process_time_raw is not None:
+        minutes = int(process_time_raw)
+        seconds = int((process_time_raw - minutes) * 60)
+        process_time = f"{minutes:02d}:{seconds:02d}"
+    else:
+        process_time = "N/A"
+
+    return f"{node_id}<br>Process Time: {process_time}<br>Capacity: {capacity}"
+
+
+def _product_path(route: List[Any], pos: Dict[Any, Tuple[float, float]], n_steps: int) -> List[Tuple[float, float]]:
+    """Interpolated (x, y) position of a product at every animation step."""
+    points = []
+    seg_count = len(route) - 1
+    for step in range(n_steps + 1):
+        t = step / n_steps
+        seg_float = t * seg_count
+        seg_idx = int(seg_float)
+        local_t = seg_float - seg_idx
+        if seg_idx >= seg_count:
+            seg_idx = seg_count - 1
+            local_t = 1.0
+
+        x0, y0 = pos[route[seg_idx]]
+        x1, y1 = pos[route[seg_idx + 1]]
+        points.append((x0 * (1 - local_t) + x1 * local_t, y0 * (1 - local_t) + y1 * local_t))
+    return points
+
+
+def _structure(graph: nx.DiGraph, n_valid_products: int, n_steps: int, frame_duration_ms: int, loop: bool) -> Tuple:
+    """Everything that fixes the trace/frame layout; a change here needs a full rebuild."""
+    return (
+        tuple((node, tuple(data["pos"])) for node, data in graph.nodes(data=True)),
+        tuple(graph.edges()),
+        n_valid_products,
+        n_steps,
+        frame_duration_ms,
+        loop,
+    )
+
+
+def graph_figure_key(
+    graph: nx.DiGraph,
+    products: List[Dict[str, Any]] | None = None,
+    n_steps: int = 50,
+    frame_duration_ms: int = 50,
+    loop: bool = True,
+) -> str:
+    """Stable hash of everything ``build_graph_figure`` renders."""
+    payload = {
+        "nodes": [[node, data] for node, data in graph.nodes(data=True)],
+        "edges": [[u, v, data.get("color", "gray")] for u, v, data in graph.edges(data=True)],
+        "products": [[p.get("route", []), p.get("color", "red")] for p in products or []],
+        "params": [n_steps, frame_duration_ms, loop],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def clear_figure_cache() -> None:
+    _FIGURE_CACHE.clear()
+
+
 def build_graph_figure(
     graph: nx.DiGraph,
     products: List[Dict[str, Any]] | None = None,
@@ -10,10 +106,17 @@ def build_graph_figure(
     frame_duration_ms: int = 50,
     show_slider: bool = True,  # kept for API compatibility, currently unused
     loop: bool = True,
+    use_cache: bool = True,
 ) -> go.Figure:
     """
     Build a Plotly figure for a graph with optional animated products.
 
+    Figures are cached by ``graph_figure_key``, so identical inputs return the
+    same figure. Cached figures are shared between callers (and Streamlit
+    sessions) and must not be mutated. To apply interactive edits without a
+    full rebuild, keep a figure you own (e.g. in ``st.session_state``) and
+    patch it with ``update_graph_figure``.
+
     Args:
         graph: ``nx.DiGraph`` with nodes having ``'pos': (x, y)``.
         products: Optional list of dicts, each with keys:
@@ -23,15 +126,113 @@ def build_graph_figure(
         frame_duration_ms: Playback speed; duration of each frame in ms.
         show_slider: Whether to show a frame slider under the plot.
         loop: Whether the Play button should loop the animation.
+        use_cache: Whether to reuse cached figures. ``False`` returns a new figure owned by the caller.
 
     Returns:
         A configured ``go.Figure``.
     """
+    if not use_cache:
+        return _build_graph_figure(graph, products, n_steps, frame_duration_ms, loop)
+
+    key = graph_figure_key(graph, products, n_steps, frame_duration_ms, loop)
+    if key in _FIGURE_CACHE:
+        _FIGURE_CACHE.move_to_end(key)
+        return _FIGURE_CACHE[key]
+
+    fig = _build_graph_figure(graph, products, n_steps, frame_duration_ms, loop)
+    fig._graph_state.shared = True
+    _FIGURE_CACHE[key] = fig
+    while len(_FIGURE_CACHE) > FIGURE_CACHE_SIZE:
+        _FIGURE_CACHE.popitem(last=False)
+    return fig
+
+
+def update_graph_figure(
+    fig: go.Figure,
+    graph: nx.DiGraph,
+    products: List[Dict[str, Any]] | None = None,
+) -> go.Figure:
+    """
+    Patch a figure from ``build_graph_figure`` in place to match ``graph`` and ``products``.
+
+    Only the traces and frame entries whose inputs changed are touched: edge
+    colors, node hover text, and the marker color / frame positions of
+    changed products. Structural changes (nodes, positions, edge set, number
+    of products) fall back to a full rebuild, returned as a new figure.
+    A cached (shared) figure is never modified; a patched copy is returned.
+
+    Args:
+        fig: Figure previously returned by ``build_graph_figure``.
+        graph: Updated graph.
+        products: Updated products (same format as ``build_graph_figure``).
+
+    Returns:
+        The patched figure (``fig`` itself unless it was shared or a rebuild was needed).
+    """
+    if fig._graph_state.shared:
+        state = replace(copy.deepcopy(fig._graph_state), shared=False)
+        fig = go.Figure(fig)
+        fig._graph_state = state
+    state: _FigureState = fig._graph_state
+    _, _, _, n_steps, frame_duration_ms, loop = state.structure
+    valid_products = _valid_products(products)
+
+    if _structure(graph, len(valid_products), n_steps, frame_duration_ms, loop) != state.structure:
+        return _build_graph_figure(graph, products, n_steps, frame_duration_ms, loop)
+
+    pos = {node: data["pos"] for node, data in graph.nodes(data=True)}
+
+    with fig.batch_update():
+        # --- Edge colors ---
+        for u, v, data in graph.edges(data=True):
+            color = data.get("color", "gray")
+            if state.edge_colors[(u, v)] != color:
+                fig.data[state.edge_trace_indices[(u, v)]].line.color = color
+                state.edge_colors[(u, v)] = color
+
+        # --- Node hover text ---
+        node_attrs = {node: _freeze(data) for node, data in graph.nodes(data=True)}
+        if node_attrs != state.node_attrs:
+            fig.data[state.node_trace_index].hovertext = [
+                _node_hover_text(node, graph.nodes[node]) for node in pos
+            ]
+            state.node_attrs = node_attrs
+
+        # --- Products: marker color and, if the route changed, its frame positions ---
+        for j, product in enumerate(valid_products):
+            route, color = tuple(product["route"]), product.get("color", "red")
+            old_route, old_color = state.products[j]
+            trace_idx = state.product_trace_indices[j]
+
+            if color != old_color:
+                fig.data[trace_idx].marker.color = color
+            if route != old_route:
+                fig.data[trace_idx].x, fig.data[trace_idx].y = [pos[route[0]][0]], [pos[route[0]][1]]
+                for frame, (x, y) in zip(fig.frames, _product_path(list(route), pos, n_steps)):
+                    frame.data[j].x, frame.data[j].y = [x], [y]
+            state.products[j] = (route, color)
+
+    return fig
+
+
+def _freeze(data: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, repr(v)) for k, v in data.items()))
+
+
+def _build_graph_figure(
+    graph: nx.DiGraph,
+    products: List[Dict[str, Any]] | None,
+    n_steps: int,
+    frame_duration_ms: int,
+    loop: bool,
+) -> go.Figure:
     # Node positions
     pos = {node: data["pos"] for node, data in graph.nodes(data=True)}
 
     # --- Base figure ---
     fig = go.Figure()
+    edge_colors: Dict[Tuple[Any, Any], str] = {}
+    edge_trace_indices: Dict[Tuple[Any, Any], int] = {}
 
     # --- Static edges ---
     for u, v, data in graph.edges(data=True):
@@ -46,27 +247,14 @@ def build_graph_figure(
             hoverinfo="skip",
             showlegend=False
         ))
+        edge_colors[(u, v)] = color
+        edge_trace_indices[(u, v)] = len(fig.data) - 1
 
     # --- Static nodes ---
     # Build hover text with node details
     node_ids = list(pos.keys())
-    hover_texts = []
-    for node_id in node_ids:
-        node_data = graph.nodes[node_id]
-        process_time_raw = node_data.get("process_time")
-        capacity = node_data.get("capacity", "N/A")
-        
-        # Convert process_time from minutes (float) to mm:ss format
-        if process_time_raw is not None:
-            minutes = int(process_time_raw)
-            seconds = int((process_time_raw - minutes) * 60)
-            process_time = f"{minutes:02d}:{seconds:02d}"
-        else:
-            process_time = "N/A"
-        
-        hover_text = f"{node_id}<br>Process Time: {process_time}<br>Capacity: {capacity}"
-        hover_texts.append(hover_text)
-    
+    hover_texts = [_node_hover_text(node_id, graph.nodes[node_id]) for node_id in node_ids]
+
     fig.add_trace(go.Scatter(
         x=[p[0] for p in pos.values()],
         y=[p[1] for p in pos.values()],
@@ -78,18 +266,14 @@ def build_graph_figure(
         hovertext=hover_texts,
         showlegend=False
     ))
+    node_trace_index = len(fig.data) - 1
 
 
     # --- Animation frames (moving products only) ---
-    # Normalise products to a list and filter out invalid routes.
-    raw_products = products or []
-    valid_products = [
-        p for p in raw_products
-        if len(p.get("route", [])) >= 2
-    ]
+    valid_products = _valid_products(products)
+    product_trace_indices: List[int] = []
     if valid_products:
         # Add one scatter trace per product so frames can update them by index.
-        product_trace_indices: List[int] = []
         for product in valid_products:
             route = product["route"]
             color = product.get("color", "red")
@@ -109,32 +293,11 @@ def build_graph_figure(
             product_trace_indices.append(len(fig.data) - 1)
 
         # Build animation frames that update only the product traces.
+        paths = [_product_path(product["route"], pos, n_steps) for product in valid_products]
         frames: List[go.Frame] = []
         for step in range(n_steps + 1):
-            t = step / n_steps
-            frame_traces = []
-
-            for product in valid_products:
-                route = product["route"]
-
-                seg_count = len(route) - 1
-                seg_float = t * seg_count
-                seg_idx = int(seg_float)
-                local_t = seg_float - seg_idx
-                if seg_idx >= seg_count:
-                    seg_idx = seg_count - 1
-                    local_t = 1.0
-
-                src, dst = route[seg_idx], route[seg_idx + 1]
-                x0, y0 = pos[src]
-                x1, y1 = pos[dst]
-
-                x = x0 * (1 - local_t) + x1 * local_t
-                y = y0 * (1 - local_t) + y1 * local_t
-
-                # Only need x/y updates; marker style can be inherited.
-                frame_traces.append(go.Scatter(x=[x], y=[y]))
-
+            # Only need x/y updates; marker style can be inherited.
+            frame_traces = [go.Scatter(x=[path[step][0]], y=[path[step][1]]) for path in paths]
             frames.append(
                 go.Frame(
                     data=frame_traces,
@@ -202,4 +365,13 @@ def build_graph_figure(
         yaxis=dict(visible=False)
     )
 
+    fig._graph_state = _FigureState(
+        structure=_structure(graph, len(valid_products), n_steps, frame_duration_ms, loop),
+        edge_colors=edge_colors,
+        edge_trace_indices=edge_trace_indices,
+        node_attrs={node: _freeze(data) for node, data in graph.nodes(data=True)},
+        node_trace_index=node_trace_index,
+        products=[(tuple(p["route"]), p.get("color", "red")) for p in valid_products],
+        product_trace_indices=product_trace_indices,
+    )
     return fig